@@ -0,0 +1,120 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Type
+
+from sqlalchemy import exc
+from sqlalchemy.pool import Pool
+
+from metrics import Counter, Histogram
+
+pool_log = logging.getLogger("sql.pool")
+
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection", ("pool",),
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+POOL_CHECKOUT_TIMEOUTS = Counter("db_pool_checkout_timeouts_total", "Checkouts that gave up after pool_timeout", ("pool",))
+
+
+# Connections one worker process may hold to one database server, shared by the engines
+# that talk to it (sync and async). Keep workers x budget under MySQL's max_connections
+# (151 by default), leaving room for admin sessions and the other server's clients.
+DB_CONNECTION_BUDGET = int(os.getenv("DB_CONNECTION_BUDGET", "20"))
+
+
+def pool_settings(engines_per_server: int = 2) -> dict:
+    """create_engine pool arguments from the environment.
+
+    Each engine gets an equal share of DB_CONNECTION_BUDGET, half kept open and half
+    as overflow; DB_POOL_SIZE and DB_MAX_OVERFLOW override the split.
+    """
+    share = max(1, DB_CONNECTION_BUDGET // engines_per_server)
+    pool_size = int(os.getenv("DB_POOL_SIZE", max(1, share // 2)))
+    return {
+        "pool_size": pool_size,
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", max(0, share - pool_size))),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),  # Seconds to wait for a free connection
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),  # Seconds; stay under MySQL's wait_timeout
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "True") == "True",
+    }
+
+
+class PoolWaitStats:
+    def __init__(self, label: str, log_after_ms: float):
+        self.label = label
+        self.log_after_ms = log_after_ms
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, timed_out: bool, pool: Pool):
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+        POOL_CHECKOUT_WAIT.observe(seconds, self.label)
+        if timed_out:
+            POOL_CHECKOUT_TIMEOUTS.inc(self.label)
+        if timed_out or seconds * 1000 >= self.log_after_ms:
+            pool_log.warning(json.dumps({
+                "event": "pool_checkout_timeout" if timed_out else "slow_pool_checkout",
+                "pool": self.label,
+                "wait_ms": round(seconds * 1000, 1),
+                "checked_out": pool.checkedout(),
+                "size": pool.size(),
+                "overflow": max(0, pool.overflow()),
+            }))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+            }
+
+
+class _TimedCheckout:
+    wait_stats: PoolWaitStats
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.wait_stats.record(time.perf_counter() - started, True, self)
+            raise
+        self.wait_stats.record(time.perf_counter() - started, False, self)
+        return connection
+
+
+def timed_pool_class(base: Type[Pool], label: str, log_after_ms: float) -> Type[Pool]:
+    """base with checkout wait times recorded under label.
+
+    The stats live on the class, so they survive the pool being recreated by dispose().
+    """
+    return type(f"Timed{base.__name__}", (_TimedCheckout, base), {"wait_stats": PoolWaitStats(label, log_after_ms), "base_name": base.__name__})
+
+
+def pool_status(pool: Pool) -> dict:
+    status = {
+        "class": getattr(pool, "base_name", type(pool).__name__),
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(0, pool.overflow()),
+        "max_overflow": getattr(pool, "_max_overflow", None),
+        "timeout": pool.timeout(),
+        "recycle": pool._recycle,
+        "pre_ping": pool._pre_ping,
+    }
+    if isinstance(pool, _TimedCheckout):
+        status["checkout_wait"] = pool.wait_stats.snapshot()
+    return status
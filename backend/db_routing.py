@@ -0,0 +1,116 @@
+import asyncio
+import time
+from typing import Dict, Mapping, Optional
+
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import column, select, table, update
+from sqlalchemy.engine import Engine
+
+# Lightweight table handles, so this module does not depend on the app's models
+heartbeat_table = table("replica_heartbeat", column("id"), column("beat_ms"))
+change_versions_table = table("change_versions", column("name"), column("version"))
+
+# A write hands the client a pin (epoch seconds) in both forms; it sends it back with
+# later requests to any worker. Token-authenticated cross-origin clients send no
+# cookies, so they echo the header instead.
+READ_PIN_COOKIE = "primary_reads_until"
+READ_PIN_HEADER = "X-Read-Pin"
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+class ReplicaRouter:
+    """Decides per request whether a declared read-only query may go to the replica.
+
+    Every worker writes a heartbeat to the primary and reads it back from the replica;
+    the difference is the replica's lag. Reads fall back to the primary when:
+    - no replica is configured, or the last check failed or is too old;
+    - the lag exceeds max_lag seconds;
+    - the client wrote recently (its read pin cookie or header has not expired), so it reads its own writes;
+    - the replica has not yet replayed the change versions the response depends on,
+      so ETags and cached snapshots never describe older data.
+    """
+
+    def __init__(self, primary: Engine, replica: Optional[Engine], max_lag: float = 5.0, interval: float = 1.0):
+        self.primary = primary
+        self.replica = replica
+        self.max_lag = max_lag
+        self.interval = interval
+        self.lag: Optional[float] = None
+        self.replica_versions: Dict[str, int] = {}
+        self.checked_at = float("-inf")
+        self.last_error: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.replica is not None
+
+    @property
+    def pin_seconds(self) -> float:
+        # Past this, a healthy replica has replayed the client's write
+        return self.max_lag + self.interval
+
+    @property
+    def healthy(self) -> bool:
+        return (
+            self.enabled
+            and self.lag is not None
+            and self.lag <= self.max_lag
+            and time.monotonic() - self.checked_at <= self.max_lag
+        )
+
+    def pin(self) -> str:
+        return f"{time.time() + self.pin_seconds:.3f}"
+
+    def pinned(self, request: Request) -> bool:
+        now = time.time()
+        for pin in (request.cookies.get(READ_PIN_COOKIE), request.headers.get(READ_PIN_HEADER)):
+            try:
+                if pin and float(pin) > now:
+                    return True
+            except ValueError:
+                pass
+        return False
+
+    def use_replica(self, request: Request, required_versions: Mapping[str, int]) -> bool:
+        if not self.healthy or self.pinned(request):
+            return False
+        return all(self.replica_versions.get(name, -1) >= version for name, version in required_versions.items())
+
+    def beat(self):
+        with self.primary.begin() as conn:
+            conn.execute(update(heartbeat_table).where(heartbeat_table.c.id == 1).values(beat_ms=int(time.time() * 1000)))
+
+    def check(self):
+        try:
+            with self.replica.connect() as conn:
+                beat_ms = conn.execute(select(heartbeat_table.c.beat_ms).where(heartbeat_table.c.id == 1)).scalar()
+                versions = dict(conn.execute(select(change_versions_table.c.name, change_versions_table.c.version)).all())
+        except Exception as e:
+            self.lag = None
+            self.last_error = str(e)[:500]
+            return
+        self.lag = max(0.0, time.time() - beat_ms / 1000) if beat_ms else None
+        self.replica_versions = versions
+        self.checked_at = time.monotonic()
+        self.last_error = None if beat_ms else "No heartbeat on the replica yet"
+
+    async def run(self):
+        while True:
+            try:
+                await run_in_threadpool(self.beat)
+            except Exception as e:
+                self.last_error = f"Heartbeat write failed: {e}"[:500]
+            await run_in_threadpool(self.check)
+            await asyncio.sleep(self.interval)
+
+    def status(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "healthy": self.healthy,
+            "lag_seconds": round(self.lag, 3) if self.lag is not None else None,
+            "max_lag_seconds": self.max_lag,
+            "last_check_seconds_ago": round(time.monotonic() - self.checked_at, 3) if self.checked_at > float("-inf") else None,
+            "replica_versions": self.replica_versions,
+            "last_error": self.last_error,
+        }
@@ -1,10 +1,17 @@
 from pydantic import BaseModel
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
+from fastapi_mail import ConnectionConfig
+import aiosmtplib
+import asyncio
+import mimetypes
 import os
+import time
+from email.message import EmailMessage
+from email.utils import formataddr, formatdate, make_msgid
 from dotenv import load_dotenv
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
-from typing import List, Optional
+from typing import Iterable, List, Optional, Tuple
+from metrics import Counter, Histogram
 
 load_dotenv()
 
@@ -21,27 +28,137 @@ conf = ConnectionConfig(
     MAIL_SERVER=os.getenv("MAIL_SERVER"),
     MAIL_STARTTLS=os.getenv("MAIL_STARTTLS") == "True",
     MAIL_SSL_TLS=os.getenv("MAIL_SSL_TLS") == "True",
-    USE_CREDENTIALS=True
+    USE_CREDENTIALS=os.getenv("MAIL_USE_CREDENTIALS", "True") == "True"  # False for a local aiosmtpd stand-in
 )
 
 
-fast_mail = FastMail(conf)
+EMAIL_SEND_SECONDS = Histogram("email_send_duration_seconds", "SMTP delivery time per message", ("result",))
+EMAIL_SEND_FAILURES = Counter("email_send_failures_total", "Messages that could not be delivered, by error type", ("error",))
+
+
+class PooledMailer:
+    """Sends mail over a small pool of long-lived, authenticated SMTP connections.
+
+    A connection is opened (connect + STARTTLS + login) once and reused for later
+    messages. A connection the server dropped is replaced and the message retried
+    once on the new one.
+    """
+
+    def __init__(self, config: ConnectionConfig, size: int = 2, idle_timeout: float = 60):
+        self.config = config
+        self.size = size
+        self.idle_timeout = idle_timeout  # Reconnect instead of reusing a connection idle this long
+        self._idle: List[Tuple[aiosmtplib.SMTP, float]] = []
+        self._slots: Optional[asyncio.Semaphore] = None  # Created on first use, inside the event loop
+
+    def _sender(self) -> str:
+        if self.config.MAIL_FROM_NAME is not None:
+            return formataddr((self.config.MAIL_FROM_NAME, self.config.MAIL_FROM))
+        return self.config.MAIL_FROM
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        smtp = aiosmtplib.SMTP(
+            hostname=self.config.MAIL_SERVER,
+            port=self.config.MAIL_PORT,
+            timeout=self.config.TIMEOUT,
+            use_tls=self.config.MAIL_SSL_TLS,
+            start_tls=self.config.MAIL_STARTTLS,
+            validate_certs=self.config.VALIDATE_CERTS,
+        )
+        await smtp.connect()
+        if self.config.USE_CREDENTIALS:
+            await smtp.login(self.config.MAIL_USERNAME, self.config.MAIL_PASSWORD.get_secret_value())
+        return smtp
+
+    async def _acquire(self) -> aiosmtplib.SMTP:
+        while self._idle:
+            smtp, last_used = self._idle.pop()
+            if smtp.is_connected and time.monotonic() - last_used < self.idle_timeout:
+                return smtp
+            await self._discard(smtp)
+        return await self._connect()
+
+    def _release(self, smtp: aiosmtplib.SMTP):
+        self._idle.append((smtp, time.monotonic()))
+
+    async def _discard(self, smtp: aiosmtplib.SMTP):
+        try:
+            await smtp.quit()
+        except Exception:
+            smtp.close()
+
+    async def _deliver(self, msg):
+        smtp = await self._acquire()
+        try:
+            await smtp.send_message(msg)
+        except aiosmtplib.SMTPServerDisconnected:
+            # The server closed a pooled connection; retry once on a fresh one
+            smtp.close()
+            smtp = await self._connect()
+            try:
+                await smtp.send_message(msg)
+            except Exception:
+                await self._discard(smtp)
+                raise
+        except aiosmtplib.SMTPResponseException:
+            self._release(smtp)  # The connection is still usable; only this message was refused
+            raise
+        except Exception:
+            await self._discard(smtp)
+            raise
+        self._release(smtp)
+
+    async def send_message(self, msg: EmailMessage):
+        if "From" not in msg:
+            msg["From"] = self._sender()
+        if self.config.SUPPRESS_SEND:
+            return
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.size)
+        async with self._slots:
+            started = time.perf_counter()
+            try:
+                await self._deliver(msg)
+            except Exception as e:
+                EMAIL_SEND_SECONDS.observe(time.perf_counter() - started, "failed")
+                EMAIL_SEND_FAILURES.inc(type(e).__name__)
+                raise
+            EMAIL_SEND_SECONDS.observe(time.perf_counter() - started, "sent")
+
+    async def send_many(self, messages: Iterable[EmailMessage]) -> List[Optional[Exception]]:
+        """Send a batch over the pooled connections; returns one error (or None) per message"""
+        messages = list(messages)
+        results = await asyncio.gather(*(self.send_message(message) for message in messages), return_exceptions=True)
+        return [result if isinstance(result, Exception) else None for result in results]
+
+    async def close(self):
+        idle, self._idle = self._idle, []
+        for smtp, _ in idle:
+            await self._discard(smtp)
+
+
+mailer = PooledMailer(conf, size=int(os.getenv("MAIL_POOL_SIZE", "2")))
+
+def build_message(email: EmailSchema, attachment_path: Optional[str] = None) -> EmailMessage:
+    """HTML message with an optional file attached; the mailer fills in From"""
+    msg = EmailMessage()
+    msg["To"] = email.email
+    msg["Subject"] = email.subject
+    msg["Date"] = formatdate(localtime=True)
+    msg["Message-ID"] = make_msgid()
+    msg.set_content(email.body, subtype="html")
+    if attachment_path:
+        content_type = mimetypes.guess_type(attachment_path)[0] or "application/octet-stream"
+        maintype, subtype = content_type.split("/", 1)
+        with open(attachment_path, "rb") as attachment:
+            msg.add_attachment(attachment.read(), maintype=maintype, subtype=subtype, filename=os.path.basename(attachment_path))
+    return msg
 
 async def send_email(email: EmailSchema, attachment_path: Optional[str] = None):
-    message = MessageSchema(
-        subject=email.subject,
-        recipients=[email.email],  
-        body=email.body,
-        subtype=MessageType.html  ,
-        attachments=[attachment_path] if attachment_path else []
-    )
-
-
-  
-    fast_mail = FastMail(conf)
+    message = build_message(email, attachment_path)
 
     try:
-        await fast_mail.send_message(message)
+        await mailer.send_message(message)
         print(f"✅ Email successfully sent to {email.email}")
         return {"status": "success", "message": f"Email sent to {email.email}"}
 
@@ -93,16 +210,14 @@ def generate_invoice(order_details):
 
 async def send_reset_email(email: str, reset_token: str):
     reset_url = f"http://localhost:3039/reset-password/{reset_token}"  # React frontend URL
-    message = MessageSchema(
+    message = build_message(EmailSchema(
+        email=email,
         subject="Password Reset",
-        recipients=[email],  
         body=f"\nClick the link to reset your password: {reset_url}",
-        subtype=MessageType.html  ,
-    )
-    fast_mail = FastMail(conf)
+    ))
 
     try:
-        await fast_mail.send_message(message)
+        await mailer.send_message(message)
         print(f"✅ Email successfully sent to {email}")
         return {"status": "success", "message": f"Email sent to {email}"}
     except Exception as e:
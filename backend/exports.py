@@ -0,0 +1,50 @@
+import csv
+import datetime
+import io
+import json
+from decimal import Decimal
+from typing import Iterator
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql import Select
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _plain(value):
+    # Dates as ISO 8601 and decimals as exact strings, the same in both formats
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def export_rows(engine: Engine, statement: Select, fmt: str, batch_size: int) -> Iterator[bytes]:
+    """Run statement on a server-side cursor and yield the rows as CSV or NDJSON, one chunk per batch.
+
+    Only batch_size rows are held at a time however large the table. The connection stays
+    checked out until the client has read the last chunk (or disconnects and the generator closes).
+    """
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(statement)
+        columns = list(result.keys())
+        buffer = io.StringIO()
+        writer = csv.writer(buffer) if fmt == "csv" else None
+        if writer:
+            writer.writerow(columns)
+        for rows in result.partitions():
+            for row in rows:
+                values = [_plain(value) for value in row]
+                if writer:
+                    writer.writerow(values)
+                else:
+                    buffer.write(json.dumps(dict(zip(columns, values)), separators=(",", ":")) + "\n")
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()  # Header of an empty CSV export
@@ -0,0 +1 @@
+cdef dict MB_LENGTH = {8: 1, 33: 3, 88: 2, 91: 2}
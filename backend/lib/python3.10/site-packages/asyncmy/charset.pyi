@@ -0,0 +1,22 @@
+# This file was generated by stubgen-pyx v0.2.18 from /Users/long2ice/Developer/long2ice/asyncmy/asyncmy/charset.pyx
+
+class Charset:
+    id: int
+    name: str
+    collation: str
+
+    def __init__(self, id: int, name: str, collation: str, is_default: str): ...
+    def __repr__(self): ...
+    @property
+    def encoding(self): ...
+    @property
+    def is_binary(self): ...
+
+class Charsets:
+    def __init__(self): ...
+    def add(self, c: Charset): ...
+    def by_id(self, id: int): ...
+    def by_name(self, name: str): ...
+
+def charset_by_name(name: str): ...
+def charset_by_id(id: int): ...
@@ -0,0 +1 @@
+from .binlogstream import BinLogStream  # noqa:F401
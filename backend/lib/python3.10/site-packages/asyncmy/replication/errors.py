@@ -0,0 +1,10 @@
+class TableMetadataUnavailableError(Exception):
+    """
+    raise when table metadata is unavailable
+    """
+
+
+class BinLogNotEnabledError(Exception):
+    """
+    raise when binlog not enabled
+    """
@@ -1,24 +1,50 @@
+import asyncio
+import base64
+import hashlib
 import json
-from fastapi import FastAPI, Depends, HTTPException, status, Query, UploadFile, File, Form,BackgroundTasks
-from email_service import send_email, EmailSchema,generate_invoice, send_reset_email
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import FastAPI, Depends, HTTPException, status, Query, UploadFile, File, Form,BackgroundTasks, Request, Response
+from email_service import send_email, EmailSchema,generate_invoice, send_reset_email, mailer, build_message
+from search_index import ProductSearchIndex
 from fastapi.security import OAuth2PasswordBearer
-from passlib.context import CryptContext
+from passwords import password_hasher, HasherOverloaded
+from migrations import run_migrations
+from query_stats import instrument_engine, track_queries, report_repeats
+from metrics import REGISTRY, Counter, Gauge, Histogram, RouteLabels
+from db_pool import pool_settings, pool_status, timed_pool_class
+from db_routing import ReplicaRouter, READ_PIN_COOKIE, READ_PIN_HEADER, WRITE_METHODS
+from exports import EXPORT_FORMATS, export_rows
+from product_import import ImportConflict, ImportReport, ImportRow, batched, category_path_key, import_log, read_rows, validate_row
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 from sqlmodel import SQLModel, Session, create_engine, select, Field  
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 import jwt
 import datetime
 from datetime import timedelta
 from pydantic import BaseModel, EmailStr
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Dict, List, Optional
+from typing import Callable, Dict, FrozenSet, List, Mapping, NamedTuple, Optional, Set, Tuple
 import urllib.parse
-from sqlalchemy import Column, TIMESTAMP, text,PrimaryKeyConstraint, Integer, String, Enum, ForeignKey, TIMESTAMP, DECIMAL, JSON, UniqueConstraint
+from sqlalchemy import Column, TIMESTAMP, text,PrimaryKeyConstraint, Integer, String, Enum, ForeignKey, TIMESTAMP, DECIMAL, JSON, UniqueConstraint, Text, Index, BigInteger
 from fastapi.staticfiles import StaticFiles
 from sqlalchemy import TIMESTAMP, DECIMAL, Enum,desc
 from typing import Literal
 import os
 import secrets
+import threading
+import time
+from collections import OrderedDict
+from decimal import Decimal
+from types import MappingProxyType
 from fastapi.encoders import jsonable_encoder
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from sqlalchemy.sql import func
+from sqlalchemy import insert, delete, update, literal, or_, and_, case, null, union_all
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import NoSuchModuleError, SQLAlchemyError
 from sqlalchemy.orm import relationship
 
 
@@ -33,6 +59,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", READ_PIN_HEADER],
 )
 
 # Database Connection
@@ -42,12 +69,126 @@ database = "ecommerce"
 host = "localhost"
 
 encoded_password = urllib.parse.quote(password)
-DATABASE_URL = f"mysql+pymysql://{username}:{encoded_password}@{host}/{database}"
+DATABASE_URL = os.getenv("DATABASE_URL", f"mysql+pymysql://{username}:{encoded_password}@{host}/{database}")
+
+# Each server gets a sync and an async engine, splitting DB_CONNECTION_BUDGET between them;
+# recycling and pre-ping come from DB_POOL_* environment settings
+DB_POOL_SETTINGS = pool_settings()
+DB_POOL_WAIT_LOG_MS = float(os.getenv("DB_POOL_WAIT_LOG_MS", "100"))  # Log checkouts that waited this long
+
+# SQL_ECHO=True logs every statement; the instrumentation below is the everyday view
+engine = create_engine(
+    DATABASE_URL,
+    echo=os.getenv("SQL_ECHO") == "True",
+    poolclass=timed_pool_class(QueuePool, "primary", DB_POOL_WAIT_LOG_MS),
+    **DB_POOL_SETTINGS,
+)
+
+SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "200"))
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "10"))  # Same statement this often in one request
+SQL_DEBUG_HEADERS = os.getenv("SQL_DEBUG_HEADERS") == "True"
+instrument_engine(engine, SQL_SLOW_QUERY_MS)
+
+# Non-blocking driver for the storefront read path (get_async_db); same database
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", f"mysql+asyncmy://{username}:{encoded_password}@{host}/{database}")
+async_engines: Dict[str, AsyncEngine] = {}
+
+def get_async_engine(name: str, url: str) -> AsyncEngine:
+    # Created by the app's startup, not at import, so scripts importing main do not need the async driver
+    async_engine = async_engines.get(name)
+    if async_engine is None:
+        async_engine = create_async_engine(
+            url,
+            echo=os.getenv("SQL_ECHO") == "True",
+            poolclass=timed_pool_class(AsyncAdaptedQueuePool, name, DB_POOL_WAIT_LOG_MS),
+            **DB_POOL_SETTINGS,
+        )
+        instrument_engine(async_engine.sync_engine, SQL_SLOW_QUERY_MS)
+        async_engines[name] = async_engine
+    return async_engine
+
+# Optional read replica for routes that declare themselves read-only (read_db / async_read_db).
+# The async URL defaults to the sync one with the asyncmy driver.
+REPLICA_DATABASE_URL = os.getenv("REPLICA_DATABASE_URL")
+REPLICA_ASYNC_DATABASE_URL = os.getenv("REPLICA_ASYNC_DATABASE_URL") or (
+    REPLICA_DATABASE_URL.replace("+pymysql", "+asyncmy", 1) if REPLICA_DATABASE_URL else None
+)
+DB_REPLICA_MAX_LAG = float(os.getenv("DB_REPLICA_MAX_LAG", "5"))  # Seconds
+DB_REPLICA_CHECK_SECONDS = float(os.getenv("DB_REPLICA_CHECK_SECONDS", "1"))
+
+replica_engine = None
+if REPLICA_DATABASE_URL:
+    replica_engine = create_engine(
+        REPLICA_DATABASE_URL,
+        echo=os.getenv("SQL_ECHO") == "True",
+        poolclass=timed_pool_class(QueuePool, "replica", DB_POOL_WAIT_LOG_MS),
+        **DB_POOL_SETTINGS,
+    )
+    instrument_engine(replica_engine, SQL_SLOW_QUERY_MS)
+
+replica_router = ReplicaRouter(engine, replica_engine, max_lag=DB_REPLICA_MAX_LAG, interval=DB_REPLICA_CHECK_SECONDS)
+
+# Count and time the queries each request issues
+@app.middleware("http")
+async def sql_instrumentation(request: Request, call_next):
+    with track_queries(f"{request.method} {request.url.path}") as stats:
+        response = await call_next(request)
+    route = request.scope.get("route")
+    if route is not None:
+        stats.label = f"{request.method} {route.path}"
+    report_repeats(stats, SQL_N_PLUS_ONE_THRESHOLD)
+    if SQL_DEBUG_HEADERS:
+        response.headers["X-DB-Query-Count"] = str(stats.count)
+        response.headers["X-DB-Time-Ms"] = f"{stats.total_seconds * 1000:.1f}"
+        response.headers["X-DB-Max-Query-Ms"] = f"{stats.max_seconds * 1000:.1f}"
+        response.headers["X-DB-Repeated-Queries"] = str(len(stats.repeated(SQL_N_PLUS_ONE_THRESHOLD)))
+        if hasattr(request.state, "db_route"):
+            response.headers["X-DB-Route"] = request.state.db_route
+    return response
 
-engine = create_engine(DATABASE_URL, echo=True)
+# After a successful write, this client reads from the primary until the replica has caught up
+@app.middleware("http")
+async def pin_reads_after_writes(request: Request, call_next):
+    response = await call_next(request)
+    if replica_router.enabled and request.method in WRITE_METHODS and response.status_code < 400:
+        pin = replica_router.pin()
+        response.set_cookie(READ_PIN_COOKIE, pin, max_age=int(replica_router.pin_seconds) + 1, httponly=True, samesite="lax")
+        response.headers[READ_PIN_HEADER] = pin
+    return response
+
+HTTP_REQUESTS = Counter("http_requests_total", "Requests handled, by route template and status", ("method", "route", "status"))
+HTTP_ERRORS = Counter("http_request_errors_total", "Requests answered with a 4xx or 5xx status, or that raised", ("method", "route", "status"))
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "Time until the response headers were ready", ("method", "route"))
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being handled", ("method",))  # The route is only known after routing
+DB_POOL_SIZE = Gauge("db_pool_size", "Connections the pool keeps open", callback=lambda: engine.pool.size())
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections currently in use", callback=lambda: engine.pool.checkedout())
+DB_POOL_OVERFLOW = Gauge("db_pool_overflow", "Connections open beyond the pool size", callback=lambda: max(0, engine.pool.overflow()))
+INVOICE_RENDER_SECONDS = Histogram(
+    "invoice_render_duration_seconds", "Time to render one invoice PDF", ("result",),
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
 
-# Password Hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+METRIC_METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"}
+route_labels = RouteLabels(app.router.routes)
+
+# Labels use the route template and a fixed set of methods, so series stay bounded
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    method = request.method if request.method in METRIC_METHODS else "other"
+    HTTP_IN_FLIGHT.inc(method)
+    started = time.perf_counter()
+    status_code = "500"
+    try:
+        response = await call_next(request)
+        status_code = str(response.status_code)
+        return response
+    finally:
+        HTTP_IN_FLIGHT.dec(method)
+        route = route_labels(request.scope)
+        HTTP_LATENCY.observe(time.perf_counter() - started, method, route)
+        HTTP_REQUESTS.inc(method, route, status_code)
+        if status_code[0] in "45":
+            HTTP_ERRORS.inc(method, route, status_code)
 
 # JWT Configurations
 SECRET_KEY = "mysecretey"
@@ -55,6 +196,8 @@ REFRESH_SECRET_KEY = "myrefreshsecretkey"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 180
 REFRESH_TOKEN_EXPIRE_DAYS = 7
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+TOKEN_CACHE_TTL = 300  # Seconds
 
 # OAuth2 Scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
@@ -85,7 +228,7 @@ class Address(SQLModel, table=True):
 class OrderAddress(SQLModel, table=True):
     __tablename__ = "order_addresses"
     orderAddressID: int = Field(default=None, primary_key=True)
-    orderID: int 
+    orderID: int = Field(index=True)
     customerID: int
     name: str
     countryID: int   
@@ -100,6 +243,17 @@ class OrderAddress(SQLModel, table=True):
         sa_column=Column(TIMESTAMP, server_default=text("CURRENT_TIMESTAMP"))
     )
 
+class ReplicaHeartbeat(SQLModel, table=True):
+    # Written on the primary and read back from the replica to measure its lag (see db_routing)
+    __tablename__ = "replica_heartbeat"
+    id: int = Field(primary_key=True, sa_column_kwargs={"autoincrement": False})
+    beat_ms: int = Field(default=0, sa_column=Column(BigInteger, nullable=False, server_default="0"))
+
+class ChangeVersion(SQLModel, table=True):
+    __tablename__ = "change_versions"
+    name: str = Field(primary_key=True, max_length=64)
+    version: int = Field(default=0)
+
 class ShippingRate(SQLModel, table=True):
     __tablename__ = "shipping_rates"
     id :int = Field(default=None, primary_key=True)
@@ -109,7 +263,7 @@ class ShippingRate(SQLModel, table=True):
 class Users(SQLModel, table=True):
     userID: int = Field(default=None, primary_key=True)
     name: str
-    email: str
+    email: str = Field(index=True)
     password: str
     role: str
     profile_image:str
@@ -122,7 +276,7 @@ class Customer(SQLModel, table=True):
     CustomerID: int = Field(default=None, primary_key=True)
     FirstName: str
     LastName: str
-    Email: str
+    Email: str = Field(index=True)
     PhoneNumber: str
     Password: str
     CreatedAt: datetime.datetime = Field(
@@ -130,11 +284,17 @@ class Customer(SQLModel, table=True):
     )
     
 class Cart(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_cart_customerID_status", "customerID", "status"),
+    )
     cartID: int = Field(default=None, primary_key=True)
     customerID: int
     status: str = Field(default="active") 
 
 class Products(SQLModel, table=True):
+    __table_args__ = (
+        UniqueConstraint("SKU", name="uq_products_SKU"),  # Imports upsert by SKU
+    )
     productID: int = Field(default=None, primary_key=True)
     name: str
     description: str
@@ -150,11 +310,23 @@ class Products(SQLModel, table=True):
 class Category(SQLModel, table=True):
     categoryID: int = Field(default=None, primary_key=True)
     name: str
-    parentID: Optional[int] = Field(default=None, foreign_key="category.categoryID")
+    parentID: Optional[int] = Field(default=None, foreign_key="category.categoryID", index=True)
     description: Optional[str] = Field(default=None)
     path: Optional[str] = Field(default=None, max_length=1000)  
 
+class CategoryClosure(SQLModel, table=True):
+    # One row per (ancestor, descendant) pair, including the self pair at depth 0,
+    # so a whole subtree can be read with a single indexed lookup on ancestorID.
+    __tablename__ = "category_closure"
+    ancestorID: int = Field(foreign_key="category.categoryID", primary_key=True)
+    descendantID: int = Field(foreign_key="category.categoryID", primary_key=True, index=True)
+    depth: int = Field(default=0)
+
 class Cat_prod(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_cat_prod_categoryID_productID", "categoryID", "productID"),
+        Index("ix_cat_prod_productID", "productID"),
+    )
     id: int | None = Field(default=None, primary_key=True)
     productID: int
     categoryID: int
@@ -173,6 +345,9 @@ class CategoryCreate(SQLModel):
     parentID: Optional[int] = None
     description: Optional[str] = None
 
+class CategoryMove(SQLModel):
+    parentID: Optional[int] = None
+
 class Cart_prod(SQLModel, table=True):
     id: int | None = Field(default=None, primary_key=True)
     cartID: int = Field()
@@ -180,9 +355,11 @@ class Cart_prod(SQLModel, table=True):
     price: float
     quantity:int
     selected_options: Optional[Dict[str, str]] = Field(sa_column=Column(JSON))  # Use JSON type
+    options_hash: str = Field(default="", max_length=64)  # See options_hash()
 
+    # MySQL cannot index a JSON column, so the line is keyed on the digest instead
     __table_args__ = (
-        UniqueConstraint('cartID', 'productID', 'selected_options', name='uq_cart_product_options'),
+        UniqueConstraint('cartID', 'productID', 'options_hash', name='uq_cart_product_options'),
     )
 
 
@@ -199,8 +376,15 @@ class AddressCreate(SQLModel):
     phone_number: str
 
 class Orders(SQLModel, table=True):
+    __table_args__ = (
+        # Filters and sort orders of /admin-view-orders
+        Index("ix_orders_created_at", "created_at"),
+        Index("ix_orders_status_created_at", "status", "created_at"),
+        Index("ix_orders_payment_status_created_at", "payment_status", "created_at"),
+        Index("ix_orders_total_price", "total_price"),
+    )
     orderID: Optional[int] = Field(default=None, primary_key=True)
-    customerID: int = Field(..., foreign_key="customers.CustomerID")
+    customerID: int = Field(..., foreign_key="customers.CustomerID", index=True)
     total_price: float = Field(..., sa_column=Column(DECIMAL(10,2)), gt=0)  # Decimal type to match MySQL
 
     created_at: datetime.datetime = Field(
@@ -228,7 +412,53 @@ class Orders(SQLModel, table=True):
         )
     )
 
-    invoice_path:str
+    invoice_path: Optional[str] = None  # Set by the invoice job once the PDF is rendered
+
+class InvoiceJob(SQLModel, table=True):
+    __tablename__ = "invoice_jobs"
+    id: Optional[int] = Field(default=None, primary_key=True)
+    orderID: int = Field(foreign_key="orders.orderID", index=True)
+    status: str = Field(
+        default="pending",
+        sa_column=Column(
+            Enum("pending", "rendering", "done", "failed", name="invoice_job_status_enum"),
+            default="pending"
+        )
+    )
+    attempts: int = Field(default=0)
+    error: Optional[str] = Field(default=None, max_length=500)
+    created_at: datetime.datetime = Field(
+        sa_column=Column(TIMESTAMP, server_default=text("CURRENT_TIMESTAMP"))
+    )
+    updated_at: datetime.datetime = Field(
+        sa_column=Column(TIMESTAMP, server_default=text("CURRENT_TIMESTAMP"), onupdate=text("CURRENT_TIMESTAMP"))
+    )
+
+class EmailOutbox(SQLModel, table=True):
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+    id: Optional[int] = Field(default=None, primary_key=True)
+    recipient: str = Field(max_length=255)
+    subject: str = Field(max_length=255)
+    body: str = Field(sa_column=Column(Text, nullable=False))
+    attachment_path: Optional[str] = Field(default=None, max_length=500)
+    status: str = Field(
+        default="pending",
+        sa_column=Column(
+            Enum("pending", "sending", "sent", "dead", name="email_outbox_status_enum"),
+            default="pending"
+        )
+    )
+    attempts: int = Field(default=0)
+    # Earliest time of the next attempt; while "sending" it is the dispatcher's lease expiry
+    next_attempt_at: datetime.datetime = Field(sa_column=Column(TIMESTAMP, nullable=False))
+    last_error: Optional[str] = Field(default=None, max_length=500)
+    created_at: datetime.datetime = Field(
+        sa_column=Column(TIMESTAMP, server_default=text("CURRENT_TIMESTAMP"))
+    )
+    sent_at: Optional[datetime.datetime] = Field(sa_column=Column(TIMESTAMP, nullable=True))
 
 class Order_prod(SQLModel, table=True):
     id: int | None = Field(default=None, primary_key=True)
@@ -237,10 +467,15 @@ class Order_prod(SQLModel, table=True):
     quantity: int = Field(..., gt=0)  # Must be greater than 0
     price: float = Field(..., ge=0) 
     selected_options: Optional[Dict[str, str]] = Field(sa_column=Column(JSON)) 
+    options_hash: str = Field(default="", max_length=64)
+
+    __table_args__ = (
+        Index("ix_order_prod_order_product_options", "orderID", "productID", "options_hash"),
+    )
 
 class Payments(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    orderID: int = Field(foreign_key="orders.orderID")
+    orderID: int = Field(foreign_key="orders.orderID", index=True)
     customerID: int = Field(foreign_key="customers.CustomerID")
     payment_method: str = Field(..., max_length=20)  # ENUM equivalent
     transactionID: Optional[str] = Field(default=None, unique=True, max_length=255)
@@ -251,6 +486,9 @@ class Payments(SQLModel, table=True):
     )
 
 class Returns(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_returns_orderID_requested_at", "orderID", "requested_at"),
+    )
     returnID: Optional[int] = Field(default=None, primary_key=True)
     orderID: int = Field(foreign_key="orders.orderID")
     customerID: int = Field(foreign_key="customers.CustomerID")
@@ -355,7 +593,7 @@ class ProductOption(SQLModel, table=True):
             default="active"
         )
     )
-    productID : int
+    productID : int = Field(index=True)
     is_required : str = Field(
         default="yes",
         sa_column=Column(
@@ -374,7 +612,7 @@ class ProductOptionValue(SQLModel, table=True):
     __tablename__ = "product_option_values"
 
     id : Optional[int] = Field(default=None, primary_key=True)
-    product_option_id : int  # FK to product_options
+    product_option_id : int = Field(index=True)  # FK to product_options
     title : str
     price : float = Field(sa_column=Column(DECIMAL(10, 2), nullable=False))
     sku : str
@@ -411,36 +649,114 @@ class PasswordResetRequest(BaseModel):
 
 
 
-# Create Tables
-SQLModel.metadata.create_all(engine)
+# Create and upgrade tables through the versioned migrations, before any other startup work
+@app.on_event("startup")
+def apply_migrations():
+    run_migrations(engine)
 
 # Dependency to get the database session
 def get_db():
     with Session(engine) as session:
         yield session
 
-# Function to hash password
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+# A missing async driver (asyncmy, see requirements.txt) fails startup instead of the first async request
+@app.on_event("startup")
+def create_async_engines():
+    urls = {"primary_async": ASYNC_DATABASE_URL}
+    if REPLICA_ASYNC_DATABASE_URL:
+        urls["replica_async"] = REPLICA_ASYNC_DATABASE_URL
+    for name, url in urls.items():
+        try:
+            get_async_engine(name, url)
+        except (ImportError, NoSuchModuleError) as e:
+            raise RuntimeError(
+                f"Cannot load the async database driver of {make_url(url).drivername} ({e}). "
+                "Install the backend requirements: pip install -r requirements.txt"
+            ) from e
+
+# For async handlers: queries await the network instead of holding a threadpool worker.
+# Helpers written for Session run unchanged through `await db.run_sync(helper, ...)`.
+async def get_async_db():
+    async with AsyncSession(get_async_engine("primary_async", ASYNC_DATABASE_URL), expire_on_commit=False) as session:
+        yield session
 
-# Function to verify password
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+@app.on_event("shutdown")
+async def dispose_async_engines():
+    for async_engine in async_engines.values():
+        await async_engine.dispose()
+
+# Read-only routes take their session from read_db(...) / async_read_db(...), naming the
+# change versions their response depends on. The replica serves them only when
+# replica_router allows it; otherwise they run on the primary like get_db.
+def read_db(*version_names: str):
+    def get_read_db(request: Request):
+        use_replica = replica_router.use_replica(request, {name: change_versions.get(name) for name in version_names})
+        request.state.db_route = "replica" if use_replica else "primary"
+        with Session(replica_engine if use_replica else engine) as session:
+            yield session
+    return get_read_db
+
+def async_read_db(*version_names: str):
+    async def get_async_read_db(request: Request):
+        await change_versions.ensure_fresh()
+        use_replica = replica_router.use_replica(request, {name: change_versions.get(name) for name in version_names})
+        request.state.db_route = "replica" if use_replica else "primary"
+        async_engine = (
+            get_async_engine("replica_async", REPLICA_ASYNC_DATABASE_URL) if use_replica
+            else get_async_engine("primary_async", ASYNC_DATABASE_URL)
+        )
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+    return get_async_read_db
 
-# Authenticate User & Fetch Role
-def authenticate_user(email: str, password: str, db: Session):
-    user = db.exec(select(Users).where(Users.email == email)).first()
-    
-    if not user or not verify_password(password, user.password):
-        return None
-    return user
+@app.on_event("startup")
+async def start_replica_monitor():
+    global replica_monitor
+    if replica_router.enabled:
+        replica_monitor = asyncio.create_task(replica_router.run())
 
-def authenticate_customer(email: str, password: str, db: Session):
-    customer = db.exec(select(Customer).where(Customer.Email == email)).first()
-    
-    if not customer or not verify_password(password, customer.Password):
+@app.on_event("shutdown")
+async def stop_replica_monitor():
+    if replica_monitor:
+        replica_monitor.cancel()
+
+replica_monitor: Optional[asyncio.Task] = None
+
+# Password hashing runs in passwords.password_hasher's process pool
+@app.exception_handler(HasherOverloaded)
+def password_hasher_overloaded(request: Request, exc: HasherOverloaded):
+    return JSONResponse(status_code=503, content={"detail": "Server busy, please retry"}, headers={"Retry-After": "1"})
+
+@app.on_event("shutdown")
+def stop_password_hasher():
+    password_hasher.shutdown()
+
+# Authenticate User & Fetch Role
+def resolve_identity(email: str, db: Session):
+    """Look up an email in users and customers with one query.
+
+    Returns the login fields of the matching row, preferring an admin-side user
+    when both tables hold the email, so a login runs at most one bcrypt verify.
+    """
+    users = select(
+        literal(0).label("priority"), literal("user").label("kind"), Users.userID.label("id"),
+        Users.email.label("email"), Users.password.label("password_hash"), Users.role.label("role"),
+        Users.name.label("name"), Users.profile_image.label("profile_image"),
+        null().label("first_name"), null().label("last_name"), null().label("phone"),
+    ).where(Users.email == email)
+    customers = select(
+        literal(1), literal("customer"), Customer.CustomerID,
+        Customer.Email, Customer.Password, literal("customer"),
+        null(), null(),
+        Customer.FirstName, Customer.LastName, Customer.PhoneNumber,
+    ).where(Customer.Email == email)
+    return db.exec(union_all(users, customers).order_by(text("priority")).limit(1)).first()
+
+def authenticate(email: str, password: str, db: Session):
+    identity = resolve_identity(email, db)
+    if not identity or not password_hasher.verify_sync(password, identity.password_hash):
         return None
-    return customer
+    return identity
 
 # Function to create JWT Tokens
 def create_access_token(data: dict, expires_delta: int = ACCESS_TOKEN_EXPIRE_MINUTES):
@@ -463,18 +779,16 @@ class LoginRequest(BaseModel):
 
 @app.post("/token")
 def login_for_access_token(login_data: LoginRequest, db: Session = Depends(get_db)):
-    user = authenticate_user(login_data.username, login_data.password, db)
-    if  user:
-        access_token = create_access_token({"sub": user.email, "role": user.role})
-        refresh_token = create_refresh_token({"sub": user.email, "role": user.role})
-        return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer", "name": user.name, "email": user.email,"image_path":user.profile_image, "userID":user.userID }
+    identity = authenticate(login_data.username, login_data.password, db)
+    if identity and identity.kind == "user":
+        access_token = create_access_token({"sub": identity.email, "role": identity.role})
+        refresh_token = create_refresh_token({"sub": identity.email, "role": identity.role})
+        return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer", "name": identity.name, "email": identity.email,"image_path":identity.profile_image, "userID":identity.id }
 
-        
-    customer=authenticate_customer(login_data.username, login_data.password, db)
-    if  customer:
-        access_token = create_access_token({"sub": customer.Email,"customerid":customer.CustomerID, "role": "customer", "firstName": customer.FirstName, "lastName": customer.LastName, "phone": customer.PhoneNumber})
-        refresh_token = create_refresh_token({"sub": customer.Email,"customerid":customer.CustomerID, "role": "customer"})
-        return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer", "phone": customer.PhoneNumber,"lastname": customer.LastName,"firstname": customer.FirstName, "email": customer.Email, "customerid": customer.CustomerID}
+    if identity and identity.kind == "customer":
+        access_token = create_access_token({"sub": identity.email,"customerid":identity.id, "role": "customer", "firstName": identity.first_name, "lastName": identity.last_name, "phone": identity.phone})
+        refresh_token = create_refresh_token({"sub": identity.email,"customerid":identity.id, "role": "customer"})
+        return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer", "phone": identity.phone,"lastname": identity.last_name,"firstname": identity.first_name, "email": identity.email, "customerid": identity.id}
 
     else:
      raise HTTPException(
@@ -483,8 +797,45 @@ def login_for_access_token(login_data: LoginRequest, db: Session = Depends(get_d
             headers={"WWW-Authenticate": "Bearer"},
          )
 
-# Get Current User from Token
-def get_current_user(token: str = Depends(oauth2_scheme)):
+class TokenCache:
+    """Bounded LRU of verified access tokens, so repeat requests skip the signature check.
+
+    An entry lives for at most ttl seconds and never past the token's own exp claim.
+    """
+
+    def __init__(self, size: int, ttl: float):
+        self.size = size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return entry[1]
+
+    def put(self, token: str, user: dict):
+        expires_at = min(time.time() + self.ttl, user["token"].get("exp", 0))
+        with self._lock:
+            self._entries[token] = (expires_at, user)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+
+token_cache = TokenCache(TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL)
+
+# Get Current User from Token; async so the check costs no threadpool hop
+async def get_current_user(token: str = Depends(oauth2_scheme)):
+    user = token_cache.get(token)
+    if user is not None:
+        return user
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
@@ -492,15 +843,48 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
 
         if email is None or role is None:
             raise HTTPException(status_code=401, detail="Invalid token")
-        return {"email": email, "role": role, "token": payload}
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Access token expired, use refresh token")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    user = {"email": email, "role": role, "token": payload}
+    token_cache.put(token, user)
+    return user
+
+def authorize_customer(current_user: dict, customer_id: int, allow_admin: bool = False):
+    """Check ownership from the verified token claims, without loading the customer row"""
+    if allow_admin and current_user["role"] == "admin":
+        return
+    if current_user["role"] != "customer" or current_user["token"].get("customerid") != customer_id:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+# Prometheus scrape target for this worker
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(content=REGISTRY.expose(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# Connection pool usage and checkout wait times (Admin Only)
+@app.get("/internal/db-pool")
+async def db_pool_stats(current_user: dict = Depends(get_current_user)):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Access denied")
+    pools = {"primary": pool_status(engine.pool)}
+    if replica_router.enabled:
+        pools["replica"] = pool_status(replica_engine.pool)
+    for name, async_engine in async_engines.items():
+        pools[name] = pool_status(async_engine.sync_engine.pool)
+    return {**pools, "replica_routing": replica_router.status()}
+
+# Latency and admission stats of the password hashing pool (Admin Only)
+@app.get("/internal/password-hasher")
+def password_hasher_stats(current_user: dict = Depends(get_current_user)):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Access denied")
+    return password_hasher.stats()
 
 #  Add User (Admin Only) with Password Hashing
 @app.post("/add-user")
-async def add_user(
+def add_user(
     name: str = Form(...),
     email: str = Form(...),
     password: str = Form(...),
@@ -512,7 +896,7 @@ async def add_user(
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Access denied")
 
-    hashed_password = hash_password(password)
+    hashed_password = password_hasher.hash_sync(password)
 
     image_path = None
     if profile_image:
@@ -521,7 +905,7 @@ async def add_user(
         file_path = os.path.join(UPLOAD_DIR, file_name)
 
         with open(file_path, "wb") as buffer:
-            buffer.write(await profile_image.read())  # Save file
+            buffer.write(profile_image.file.read())  # Save file
 
         image_path = f"/assets/images/{file_name}"
 
@@ -572,21 +956,203 @@ def get_user_profile(user_id: int, current_user: dict = Depends(get_current_user
 
 
 
-def get_all_subcategory_ids(category_id: int, db: Session) -> List[int]:
-    subcategory_ids = []
-    categories_to_check = [category_id]
+class ChangeVersions:
+    """Per-table change counters shared by all workers through the change_versions table.
+
+    Reads come from memory and are refreshed at most every ttl seconds, so cache
+    checks normally cost no query. Writers call bump() inside their own transaction.
+    """
+
+    def __init__(self, ttl: float = 2.0):
+        self.ttl = ttl
+        self._versions: Dict[str, int] = {}
+        self._loaded_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def stale(self) -> bool:
+        return time.monotonic() - self._loaded_at >= self.ttl
+
+    def refresh(self):
+        with self._lock:
+            if self.stale():
+                with Session(engine) as db:
+                    self._versions = dict(db.exec(select(ChangeVersion.name, ChangeVersion.version)).all())
+                self._loaded_at = time.monotonic()
+
+    async def ensure_fresh(self):
+        # Async callers refresh off the event loop, so a later get() is a memory read
+        if self.stale():
+            await run_in_threadpool(self.refresh)
+
+    async def get_async(self, name: str) -> int:
+        # For code about to run on the event loop (run_sync), where get() must not refresh
+        await self.ensure_fresh()
+        return self._versions.get(name, 0)
+
+    def get(self, name: str) -> int:
+        if self.stale():
+            self.refresh()
+        return self._versions.get(name, 0)
+
+    def bump(self, db: Session, *names: str):
+        db.exec(
+            update(ChangeVersion)
+            .where(ChangeVersion.name.in_(names))
+            .values(version=ChangeVersion.version + 1)
+        )
+        self._loaded_at = float("-inf")  # Re-read on the next check in this worker
+
+    def bump_committed(self, *names: str):
+        """bump() in a short transaction of its own, for writers that must not hold
+        the change_versions row lock for the length of their transaction"""
+        with Session(engine) as db:
+            self.bump(db, *names)
+            db.commit()
+
+    def seed(self, db: Session):
+        existing = set(db.exec(select(ChangeVersion.name)).all())
+        for name in CHANGE_VERSION_NAMES:
+            if name not in existing:
+                db.add(ChangeVersion(name=name, version=0))
+        db.commit()
+
+
+# "products" also covers cat_prod, product options and option values. Checkouts and
+# cancellations only move "stock", so responses without quantities keep their ETags.
+CHANGE_VERSION_NAMES = ("products", "category", "shipping_rates", "stock")
+change_versions = ChangeVersions()
+
+@app.on_event("startup")
+def seed_change_versions():
+    with Session(engine) as db:
+        change_versions.seed(db)
+
+CATALOG_CACHE_CONTROL = "public, max-age=30, stale-while-revalidate=300"
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+def catalog_cache(*names: str):
+    """Dependency answering If-None-Match with 304 from the change versions alone.
+
+    Returns the ETag/Cache-Control headers; they are also set on the response
+    for handlers that return plain data.
+    """
+    async def check_catalog_cache(request: Request, response: Response) -> Dict[str, str]:
+        await change_versions.ensure_fresh()
+        etag = '"' + "-".join(f"{name}.{change_versions.get(name)}" for name in names) + '"'
+        headers = {"ETag": etag, "Cache-Control": CATALOG_CACHE_CONTROL}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+        return headers
+    return check_catalog_cache
+
+
+class CategoryTreeSnapshot(NamedTuple):
+    version: int
+    body: bytes  # Pre-serialized {"Categories": [...]} response
+    category_ids: FrozenSet[int]
+    children: Mapping[Optional[int], Tuple[int, ...]]  # parentID -> child categoryIDs
+
+    def subtree(self, category_id: int) -> List[int]:
+        subcategory_ids = []
+        categories_to_check = [category_id]
+        while categories_to_check:
+            current_id = categories_to_check.pop()
+            subcategory_ids.append(current_id)
+            categories_to_check.extend(self.children.get(current_id, ()))
+        return subcategory_ids
+
+
+class CategoryTreeCache:
+    """Process-local category tree, rebuilt whenever the "category" change version moves.
+
+    Category writes bump that version in their own transaction (see ChangeVersions),
+    which invalidates the snapshot in every worker.
+    """
+
+    def __init__(self):
+        self._snapshot: Optional[CategoryTreeSnapshot] = None
+
+    def get(self, db: Session, version: Optional[int] = None) -> CategoryTreeSnapshot:
+        # Read the version before loading, so a concurrent bump forces another reload.
+        # Async callers pass it in from change_versions.get_async().
+        if version is None:
+            version = change_versions.get("category")
+        snapshot = self._snapshot
+        if snapshot and snapshot.version == version:
+            return snapshot
+
+        categories = db.exec(select(Category)).all()
+        children: Dict[Optional[int], List[int]] = {}
+        for category in categories:
+            children.setdefault(category.parentID, []).append(category.categoryID)
+
+        snapshot = CategoryTreeSnapshot(
+            version=version,
+            body=json.dumps(jsonable_encoder({"Categories": categories})).encode(),
+            category_ids=frozenset(category.categoryID for category in categories),
+            children=MappingProxyType({parent_id: tuple(ids) for parent_id, ids in children.items()}),
+        )
+        self._snapshot = snapshot
+        return snapshot
+
+
+category_cache = CategoryTreeCache()
 
-    while categories_to_check:
-        current_id = categories_to_check.pop()
-        subcategory_ids.append(current_id)
-        subcategories = db.exec(select(Category.categoryID).where(Category.parentID == current_id)).all()
-        categories_to_check.extend(subcategories)
+def get_all_subcategory_ids(category_id: int, db: Session, version: Optional[int] = None) -> List[int]:
+    tree = category_cache.get(db, version)
+    if category_id in tree.category_ids:
+        return tree.subtree(category_id)
+
+    # Not in this worker's snapshot yet; the closure table holds the self row at depth 0
+    return db.exec(select(CategoryClosure.descendantID).where(CategoryClosure.ancestorID == category_id)).all()
+
+def add_category_closure(db: Session, category_id: int, parent_id: Optional[int]):
+    # Link the new node to every ancestor of its parent, then to itself
+    if parent_id:
+        db.exec(
+            insert(CategoryClosure).from_select(
+                ["ancestorID", "descendantID", "depth"],
+                select(CategoryClosure.ancestorID, literal(category_id), CategoryClosure.depth + 1)
+                .where(CategoryClosure.descendantID == parent_id)
+            )
+        )
+    db.add(CategoryClosure(ancestorID=category_id, descendantID=category_id, depth=0))
+
+def rebuild_category_closure(db: Session):
+    """Rebuild the whole closure table from Category.parentID"""
+    parents = dict(db.exec(select(Category.categoryID, Category.parentID)).all())
+    rows = []
+    for category_id in parents:
+        ancestor_id, depth, seen = category_id, 0, set()
+        while ancestor_id is not None and ancestor_id not in seen:
+            seen.add(ancestor_id)
+            rows.append({"ancestorID": ancestor_id, "descendantID": category_id, "depth": depth})
+            ancestor_id = parents.get(ancestor_id)
+            depth += 1
+
+    db.exec(delete(CategoryClosure))
+    if rows:
+        db.exec(insert(CategoryClosure), params=rows)
+    db.commit()
 
-    return subcategory_ids
+@app.on_event("startup")
+def backfill_category_closure():
+    # Categories created before the closure table existed have no rows yet
+    with Session(engine) as db:
+        has_closure = db.exec(select(CategoryClosure.ancestorID).limit(1)).first()
+        has_categories = db.exec(select(Category.categoryID).limit(1)).first()
+        if has_categories and not has_closure:
+            rebuild_category_closure(db)
 
 #  Add Product (Admin Only)
 @app.post("/add-product")
-async def add_product(
+def add_product(
     name: str = Form(...),
     description: str = Form(...),
     SKU: str = Form(...),
@@ -599,6 +1165,8 @@ async def add_product(
 ):
     if current_user["role"] not in ["admin"]:
         raise HTTPException(status_code=403, detail="Access denied")
+    if db.exec(select(Products.productID).where(Products.SKU == SKU)).first():
+        raise HTTPException(status_code=400, detail="SKU already exists")
 
     image_path = None
     if image:
@@ -607,7 +1175,7 @@ async def add_product(
         file_path = os.path.join(UPLOAD_DIR, file_name)
 
         with open(file_path, "wb") as buffer:
-            buffer.write(await image.read())  # Save file
+            buffer.write(image.file.read())  # Save file
 
         image_path = f"/assets/images/{file_name}"
 
@@ -636,20 +1204,273 @@ async def add_product(
             db.add(product_option_value)
             db.commit()
 
+    change_versions.bump(db, "products")
+    db.commit()
+    reindex_products(db, [new_product.productID])
     return {"message": "Product added successfully", "productID": new_product.productID}
 
 
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "500"))  # Products written per transaction
+MAX_IMPORT_BATCH_SIZE = 5000
+
+def category_ids_by_path(db: Session) -> Tuple[Dict[str, int], Set[str]]:
+    """Every category keyed by its root-first name path, such as Electronics/Phones,
+    and the paths that several sibling categories share, which are left out"""
+    parents = {category_id: (name, parent_id) for category_id, name, parent_id in db.exec(select(Category.categoryID, Category.name, Category.parentID)).all()}
+    paths, ambiguous = {}, set()
+    for category_id in parents:
+        segments, current, seen = [], category_id, set()
+        while current in parents and current not in seen:
+            seen.add(current)
+            name, current = parents[current]
+            segments.append(name)
+        path = category_path_key("/".join(reversed(segments)))
+        if path in paths:
+            ambiguous.add(path)
+        paths[path] = category_id
+    for path in ambiguous:
+        del paths[path]
+    return paths, ambiguous
+
+def import_product_batch(db: Session, batch: List[Tuple[int, ImportRow]], category_paths: Dict[str, int], report: ImportReport):
+    """Create or update one batch of validated rows by SKU, in one transaction and a fixed number of statements"""
+    rows: Dict[str, Tuple[int, ImportRow]] = {}
+    for number, row in batch:
+        key = row.SKU.casefold()  # SKUs compare case-insensitively under MySQL's collation
+        if key in rows:
+            report.fail(rows[key][0], f"Replaced by row {number} with the same SKU", row.SKU)
+        rows[key] = (number, row)
+    skus = [row.SKU for _, row in rows.values()]
+
+    existing = {sku.casefold() for sku in db.exec(select(Products.SKU).where(Products.SKU.in_(skus))).all()}
+    upsert = mysql_insert(Products)
+    upsert = upsert.on_duplicate_key_update(
+        name=upsert.inserted.name,
+        description=upsert.inserted.description,
+        price=upsert.inserted.price,
+        quantity=upsert.inserted.quantity,
+        image_path=func.coalesce(upsert.inserted.image_path, Products.image_path),  # Keep the current image unless given
+    )
+    db.exec(upsert, params=[
+        {"SKU": row.SKU, "name": row.name, "description": row.description, "price": row.price, "quantity": row.quantity, "image_path": row.image_path}
+        for _, row in rows.values()
+    ])
+    product_ids = {sku.casefold(): product_id for sku, product_id in db.exec(select(Products.SKU, Products.productID).where(Products.SKU.in_(skus))).all()}
+    # A row whose SKU is still missing updated some other product through another unique key
+    if len(product_ids) < len(rows):
+        raise ImportConflict(
+            rows=[(number, row) for key, (number, row) in rows.items() if key not in product_ids],
+            retry=[(number, row) for key, (number, row) in rows.items() if key in product_ids],
+        )
+
+    # Options and categories given in a row replace the product's current ones
+    with_options = {product_ids[key]: row.options for key, (_, row) in rows.items() if row.options is not None}
+    if with_options:
+        old_option_ids = select(ProductOption.id).where(ProductOption.productID.in_(list(with_options)))
+        db.exec(delete(ProductOptionValue).where(ProductOptionValue.product_option_id.in_(old_option_ids)))
+        db.exec(delete(ProductOption).where(ProductOption.productID.in_(list(with_options))))
+        option_rows = [
+            {"productID": product_id, "title": option.title, "type": option.type, "is_required": option.is_required, "status": option.status}
+            for product_id, options in with_options.items()
+            for option in options
+        ]
+        if option_rows:
+            db.exec(insert(ProductOption), params=option_rows)
+            option_ids = {
+                (product_id, title): option_id
+                for option_id, product_id, title in db.exec(
+                    select(ProductOption.id, ProductOption.productID, ProductOption.title).where(ProductOption.productID.in_(list(with_options)))
+                ).all()
+            }
+            value_rows = [
+                {"product_option_id": option_ids[(product_id, option.title)], "title": value.title, "price": value.price, "sku": value.sku, "quantity": value.quantity}
+                for product_id, options in with_options.items()
+                for option in options
+                for value in option.values
+            ]
+            if value_rows:
+                db.exec(insert(ProductOptionValue), params=value_rows)
+
+    with_categories = {product_ids[key]: row.categories for key, (_, row) in rows.items() if row.categories is not None}
+    if with_categories:
+        db.exec(delete(Cat_prod).where(Cat_prod.productID.in_(list(with_categories))))
+        category_rows = [
+            {"productID": product_id, "categoryID": category_id}
+            for product_id, paths in with_categories.items()
+            for category_id in sorted({category_paths[category_path_key(path)] for path in paths})
+        ]
+        if category_rows:
+            db.exec(insert(Cat_prod), params=category_rows)
+
+    change_versions.bump(db, "products")
+    db.commit()
+    reindex_products(db, list(product_ids.values()))
+    report.updated += len(existing)
+    report.created += len(rows) - len(existing)
+
+def import_products(db: Session, binary, fmt: str, batch_size: int, on_batch: Optional[Callable[[ImportReport], None]] = None) -> ImportReport:
+    """Stream a CSV or NDJSON catalog into the database in batches.
+
+    Invalid rows are reported and skipped; a batch the database rejects is rolled back
+    and its rows reported, and the import carries on with the next batch.
+    """
+    report = ImportReport()
+    category_paths, ambiguous_paths = category_ids_by_path(db)
+
+    def valid_rows():
+        for number, raw, error in read_rows(binary, fmt):
+            report.rows += 1
+            sku = str(raw["SKU"]) if raw and raw.get("SKU") is not None else None
+            if error:
+                report.fail(number, error, sku)
+                continue
+            try:
+                row = validate_row(raw)
+                ambiguous = [path for path in row.categories or [] if category_path_key(path) in ambiguous_paths]
+                if ambiguous:
+                    raise ValueError(f"Several categories have the path: {', '.join(ambiguous)}")
+                unknown = [path for path in row.categories or [] if category_path_key(path) not in category_paths]
+                if unknown:
+                    raise ValueError(f"Unknown category path: {', '.join(unknown)}")
+            except ValueError as e:
+                report.fail(number, str(e), sku)
+                continue
+            yield number, row
+
+    for batch in batched(valid_rows(), batch_size):
+        while batch:
+            try:
+                import_product_batch(db, batch, category_paths, report)
+                batch = []
+            except ImportConflict as e:
+                # Undo the stray updates, report the rows that caused them and write the rest again
+                db.rollback()
+                for number, row in e.rows:
+                    report.fail(number, "Matches another product on a unique column other than SKU", row.SKU)
+                batch = e.retry
+            except Exception as e:
+                db.rollback()
+                if isinstance(e, SQLAlchemyError):
+                    error = f"Batch rejected by the database: {str(e.orig if getattr(e, 'orig', None) else e)[:300]}"
+                else:
+                    import_log.exception("Import batch failed")
+                    error = f"Batch failed: {str(e)[:300]}"
+                for number, row in batch:
+                    report.fail(number, error, row.SKU)
+                batch = []
+        report.batches += 1
+        import_log.info(json.dumps({"event": "import_batch", **report.progress()}))
+        if on_batch:
+            on_batch(report)
+    return report
+
+# Bulk create/update products by SKU from a CSV or NDJSON file (Admin Only)
+@app.post("/import-products")
+def import_products_upload(
+    file: UploadFile = File(...),
+    format: Optional[Literal["csv", "ndjson"]] = Form(None, description="Defaults to the file extension"),
+    batch_size: int = Form(IMPORT_BATCH_SIZE, ge=1, le=MAX_IMPORT_BATCH_SIZE),
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    if current_user["role"] not in ["admin"]:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    fmt = format or ("csv" if (file.filename or "").lower().endswith(".csv") else "ndjson")
+    return import_products(db, file.file, fmt, batch_size).as_dict()
+
+
+def load_product_options(db: Session, product_ids: List[int], active_only: bool = False) -> Dict[int, List[Tuple[ProductOption, List[ProductOptionValue]]]]:
+    """Options and their values for many products in two queries, grouped by productID"""
+    query = select(ProductOption).where(ProductOption.productID.in_(product_ids))
+    if active_only:
+        query = query.where(ProductOption.status == "active")
+    options = db.exec(query.order_by(ProductOption.id)).all()
+
+    values_by_option: Dict[int, List[ProductOptionValue]] = {}
+    if options:
+        option_values = db.exec(
+            select(ProductOptionValue)
+            .where(ProductOptionValue.product_option_id.in_([option.id for option in options]))
+            .order_by(ProductOptionValue.id)
+        ).all()
+        for value in option_values:
+            values_by_option.setdefault(value.product_option_id, []).append(value)
+
+    options_by_product: Dict[int, List[Tuple[ProductOption, List[ProductOptionValue]]]] = {product_id: [] for product_id in product_ids}
+    for option in options:
+        options_by_product[option.productID].append((option, values_by_option.get(option.id, [])))
+    return options_by_product
+
+def option_value_dict(value: ProductOptionValue) -> dict:
+    return {"id": value.id, "title": value.title, "price": value.price, "sku": value.sku, "quantity": value.quantity}
+
+
+product_search = ProductSearchIndex()
+SEARCH_INDEX_BATCH = 1000
+
+def product_search_fields(product: Products, options: List[Tuple[ProductOption, List[ProductOptionValue]]]) -> Dict[str, str]:
+    option_text = " ".join(f"{value.title} {value.sku}" for _, option_values in options for value in option_values)
+    return {"name": product.name, "SKU": product.SKU, "description": product.description, "options": option_text}
+
+def reindex_products(db: Session, product_ids: List[int]):
+    """Refresh the search index entries of the given products; missing products are dropped"""
+    products = db.exec(select(Products).where(Products.productID.in_(product_ids))).all()
+    options = load_product_options(db, [product.productID for product in products])
+    for product in products:
+        product_search.index_product(product.productID, product_search_fields(product, options[product.productID]))
+    for product_id in set(product_ids) - {product.productID for product in products}:
+        product_search.remove_product(product_id)
+
+@app.on_event("startup")
+def build_product_search_index():
+    # Read first: an edit committed while the rows load moves the version past this one
+    version = change_versions.get("products")
+    documents = []
+    last_id = 0
+    with Session(engine) as db:
+        while True:
+            products = db.exec(
+                select(Products).where(Products.productID > last_id).order_by(Products.productID).limit(SEARCH_INDEX_BATCH)
+            ).all()
+            if not products:
+                break
+            options = load_product_options(db, [product.productID for product in products])
+            documents.extend((product.productID, product_search_fields(product, options[product.productID])) for product in products)
+            last_id = products[-1].productID
+    product_search.rebuild(documents, version)
+
+product_search_rebuild = threading.Lock()
+
+async def fresh_product_search() -> ProductSearchIndex:
+    """The index, rebuilt first if the catalog changed since it was built.
+
+    Edits made in this worker are already indexed by reindex_products; the rebuild picks up
+    the ones other workers made, which this worker only sees as a new "products" version.
+    """
+    version = await change_versions.get_async("products")
+    if product_search.version != version:
+        def rebuild():
+            with product_search_rebuild:
+                if product_search.version != version:
+                    build_product_search_index()
+        await run_in_threadpool(rebuild)
+    return product_search
+
+
 def get_full_path(db: Session, category_id: Optional[int]) -> str:
-    path_segments = []
-    
-    while category_id:
-        category = db.get(Category, category_id)
-        if not category:
-            break
-        path_segments.append(category.name)
-        category_id = category.parentID  # Move up the hierarchy
+    if not category_id:
+        return ""
+
+    # All ancestors in one query, deepest ancestor first
+    path_segments = db.exec(
+        select(Category.name)
+        .join(CategoryClosure, CategoryClosure.ancestorID == Category.categoryID)
+        .where(CategoryClosure.descendantID == category_id)
+        .order_by(desc(CategoryClosure.depth))
+    ).all()
 
-    return "/".join(reversed(path_segments))  # Reverse to maintain root-first order
+    return "/".join(path_segments)  # Root-first order
 
 # View Products (Admin & Sales)
 @app.get("/view-products")
@@ -677,54 +1498,160 @@ def view_products(current_user: dict = Depends(get_current_user), db: Session =
 
     return {"Products": list(unique_products)}
 
+PRODUCT_PAGE_SIZE = 24
+MAX_PRODUCT_PAGE_SIZE = 100
+PRODUCT_FIELDS = tuple(Products.model_fields)
+# sort name -> (Products column, descending); productID breaks ties
+PRODUCT_SORTS = {
+    "newest": ("productID", True),
+    "price-asc": ("price", False),
+    "price-desc": ("price", True),
+}
+
+def encode_cursor(values: list) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values, default=str).encode()).decode()
+
+def decode_cursor(cursor: str, size: int = 2) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+def parse_product_cursor(cursor: str, sort_field: str) -> Tuple[int, int]:
+    # Both values go into the WHERE clause as they are, so they must have the columns' types
+    last_value, last_id = decode_cursor(cursor)
+    expected = getattr(Products, sort_field).type.python_type
+    if type(last_id) is not int or type(last_value) is not expected:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return last_value, last_id
+
+def keyset_after(sort_column, id_column, descending: bool, last_value, last_id):
+    """WHERE clause selecting the rows that come after (last_value, last_id) in sort order"""
+    if sort_column is id_column:
+        return id_column < last_id if descending else id_column > last_id
+    if descending:
+        return or_(sort_column < last_value, and_(sort_column == last_value, id_column < last_id))
+    return or_(sort_column > last_value, and_(sort_column == last_value, id_column > last_id))
+
+product_listing_cache = catalog_cache("products", "category", "stock")
+product_projection_cache = catalog_cache("products", "category")
+product_detail_cache = catalog_cache("products", "stock")
+
+async def check_product_cache(
+    request: Request,
+    response: Response,
+    product_id: Optional[int] = Query(None),
+    fields: Optional[str] = Query(None),
+) -> Dict[str, str]:
+    # Full listings and the detail page show stock counts, so every checkout moves their
+    # ETag; a listing projected without quantity only changes with the catalog
+    if product_id:
+        check = product_detail_cache
+    elif fields and "quantity" not in {field.strip() for field in fields.split(",")}:
+        check = product_projection_cache
+    else:
+        check = product_listing_cache
+    return await check(request, response)
+
 # View Products customer
-@app.get("/customer-view-products")
-def view_products(
-    db: Session = Depends(get_db),
+@app.get("/customer-view-products", dependencies=[Depends(check_product_cache)])
+async def view_products(
+    db: AsyncSession = Depends(async_read_db("products", "category", "stock")),
     category_id: Optional[int] = Query(None),
-    product_id: Optional[int] = Query(None)
+    product_id: Optional[int] = Query(None),
+    limit: int = Query(PRODUCT_PAGE_SIZE, ge=1, le=MAX_PRODUCT_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    sort: str = Query("newest", description="newest, price-asc or price-desc"),
+    fields: Optional[str] = Query(None, description="Comma-separated product columns to return"),
 ):
     if product_id:
-        product = db.get(Products, product_id)
+        product = await db.get(Products, product_id)
         if not product:
             raise HTTPException(status_code=404, detail="Product not found")
 
-        # Fetch product options and their values
-        options = db.exec(
-            select(ProductOption)
-            .where(ProductOption.productID == product_id, ProductOption.status == "active")
-        ).all()
-
-        # Create a list to include options with their values
-        options_with_values = []
-        for option in options:
-            option_values = db.exec(
-                select(ProductOptionValue)
-                .where(ProductOptionValue.product_option_id == option.id)
-            ).all()
-            options_with_values.append({
+        # Fetch active product options and their values
+        options = (await db.run_sync(load_product_options, [product_id], True))[product_id]
+        options_with_values = [
+            {
                 "option_id": option.id,
                 "title": option.title,
                 "type": option.type,
                 "is_required": option.is_required,
                 "status": option.status,
-                "values": [{"id": value.id, "title": value.title, "price": value.price, "sku": value.sku, "quantity": value.quantity} for value in option_values]
-            })
+                "values": [option_value_dict(value) for value in option_values]
+            }
+            for option, option_values in options
+        ]
 
         return {"Product": product, "Options": options_with_values}
 
-    if category_id:
-        category_ids = get_all_subcategory_ids(category_id, db)
-        products = db.exec(
-            select(Products)
-            .join(Cat_prod, Products.productID == Cat_prod.productID)
-            .where(Cat_prod.categoryID.in_(category_ids))
-        ).all()
-        unique_products = {product.productID: product for product in products}.values()
+    # Listing: one keyset-paginated page, projected to the requested columns
+    sort_field, descending = PRODUCT_SORTS.get(sort, PRODUCT_SORTS["newest"])
+    sort_column = getattr(Products, sort_field)
+
+    if fields:
+        requested = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = set(requested) - set(PRODUCT_FIELDS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+        output_fields = ["productID"] + [field for field in requested if field != "productID"]
     else:
-        unique_products = db.exec(select(Products)).all()
+        output_fields = list(PRODUCT_FIELDS)
+    select_fields = output_fields + ([sort_field] if sort_field not in output_fields else [])
 
-    return {"Products": list(unique_products)}
+    query = select(*[getattr(Products, field) for field in select_fields])
+
+    if category_id:
+        category_version = await change_versions.get_async("category")
+        category_ids = await db.run_sync(lambda session: get_all_subcategory_ids(category_id, session, category_version))
+        # Semi-join, so a product in several matching categories is returned once
+        query = query.where(Products.productID.in_(select(Cat_prod.productID).where(Cat_prod.categoryID.in_(category_ids))))
+
+    if cursor:
+        last_value, last_id = parse_product_cursor(cursor, sort_field)
+        query = query.where(keyset_after(sort_column, Products.productID, descending, last_value, last_id))
+
+    order = [desc(sort_column), desc(Products.productID)] if descending else [sort_column, Products.productID]
+    rows = (await db.exec(query.order_by(*order).limit(limit + 1))).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_row = rows[-1]._mapping
+        next_cursor = encode_cursor([last_row[sort_field], last_row["productID"]])
+
+    products = [{field: row._mapping[field] for field in output_fields} for row in rows]
+    return {"Products": products, "next_cursor": next_cursor}
+
+
+# Search products (the customer frontend calls /products/search)
+@app.get("/search")
+@app.get("/products/search")
+async def search_products(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=MAX_PRODUCT_PAGE_SIZE),
+    db: AsyncSession = Depends(async_read_db("products")),
+):
+    ranked = (await fresh_product_search()).search(q, limit=limit)
+    if not ranked:
+        return {"query": q, "Products": []}
+
+    scores = dict(ranked)
+    products = (await db.exec(select(Products).where(Products.productID.in_(list(scores))))).all()
+    products_by_id = {product.productID: product for product in products}
+    results = [
+        {**products_by_id[product_id].model_dump(), "score": round(score, 4)}
+        for product_id, score in ranked
+        if product_id in products_by_id
+    ]
+    return {"query": q, "Products": results}
+
+@app.get("/search/autocomplete")
+async def autocomplete_products(q: str = Query(..., min_length=1), limit: int = Query(10, ge=1, le=50)):
+    return {"query": q, "suggestions": (await fresh_product_search()).suggest(q, limit=limit)}
 
 
 # View Categories
@@ -733,18 +1660,16 @@ def view_categories(current_user: dict = Depends(get_current_user), db: Session
     if current_user["role"] not in ["admin", "sales",]:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    categories = db.exec(select(Category)).all()
-    return {"Categories": categories}
+    return Response(content=category_cache.get(db).body, media_type="application/json")
 
 # View Categories for customer
 @app.get("/customer-view-categories")
-def view_categories( db: Session = Depends(get_db)):
-
-    categories = db.exec(select(Category)).all()
-    return {"Categories": categories}
+async def view_categories( db: AsyncSession = Depends(async_read_db("category")), cache_headers: Dict[str, str] = Depends(catalog_cache("category"))):
+    snapshot = await db.run_sync(category_cache.get, await change_versions.get_async("category"))
+    return Response(content=snapshot.body, media_type="application/json", headers=cache_headers)
 
 @app.put("/edit_profile/{user_id}")
-async def update_user(
+def update_user(
     user_id: int,
     name: str = Form(...),
     email: str = Form(...),
@@ -768,7 +1693,7 @@ async def update_user(
         file_path = os.path.join(UPLOAD_DIR, file_name)
 
         with open(file_path, "wb") as buffer:
-            buffer.write(await profile_image.read())  # Save file
+            buffer.write(profile_image.file.read())  # Save file
 
         user.profile_image = f"/assets/images/{file_name}"
         
@@ -782,7 +1707,7 @@ class ChangePasswordRequest(BaseModel):
     email:str
 
 @app.put("/change-password/{user_id}")
-async def change_password(
+def change_password(
     user_id: int,
     request: ChangePasswordRequest,
     db: Session = Depends(get_db),
@@ -796,10 +1721,10 @@ async def change_password(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    if not verify_password(request.current_password, user.password):
+    if not password_hasher.verify_sync(request.current_password, user.password):
         raise HTTPException(status_code=403, detail="Current password is incorrect")
 
-    user.password = hash_password(request.new_password)
+    user.password = password_hasher.hash_sync(request.new_password)
     db.commit()
 
     return {"message": "Password changed successfully"}
@@ -817,7 +1742,7 @@ def update_user(user_id: int, user_data: UserCreate, current_user: dict = Depend
 
     existing_user.name = user_data.name
     existing_user.email = user_data.email
-    existing_user.password = hash_password(user_data.password)
+    existing_user.password = password_hasher.hash_sync(user_data.password)
     existing_user.role = user_data.role
 
     db.commit()
@@ -841,16 +1766,14 @@ def delete_users(data: DeleteUsersRequest, current_user: dict = Depends(get_curr
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Access denied")
 
-    users_to_delete = db.query(Users).filter(Users.userID.in_(data.user_ids)).all()
-    
-    if not users_to_delete:
-        raise HTTPException(status_code=404, detail="No users found to delete")
+    deleted = 0
+    for chunk in id_chunks(data.user_ids):
+        deleted += db.exec(delete(Users).where(Users.userID.in_(chunk))).rowcount
+        db.commit()
 
-    for user in users_to_delete:
-        db.delete(user)
-    
-    db.commit()
-    return {"message": f"{len(users_to_delete)} users deleted successfully"}
+    if not deleted:
+        raise HTTPException(status_code=404, detail="No users found to delete")
+    return {"message": f"{deleted} users deleted successfully", "deleted": {"users": deleted}}
 
 #  Add Category (Admin Only)
 @app.post("/add-category")
@@ -868,10 +1791,68 @@ def add_category(data: CategoryCreate, current_user: dict = Depends(get_current_
         path=new_category_path+"/"+data.name
     )
     db.add(new_category)
+    db.flush()  # Get the new category ID
+    add_category_closure(db, new_category.categoryID, data.parentID)
+    change_versions.bump(db, "category")
     db.commit()
     db.refresh(new_category)
     return {"message": "Category added", "category": new_category}
 
+# Move a category (and its whole subtree) under a new parent (Admin Only)
+@app.put("/move-category/{category_id}")
+def move_category(category_id: int, data: CategoryMove, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
+    if current_user["role"] not in ["admin"]:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    category = db.get(Category, category_id)
+    if not category:
+        raise HTTPException(status_code=404, detail="Category not found")
+
+    subtree = db.exec(
+        select(CategoryClosure.descendantID, CategoryClosure.depth)
+        .where(CategoryClosure.ancestorID == category_id)
+    ).all()
+    subtree_ids = [descendant_id for descendant_id, _ in subtree]
+
+    if data.parentID is not None:
+        if not db.get(Category, data.parentID):
+            raise HTTPException(status_code=404, detail="Parent category not found")
+        if data.parentID in subtree_ids:
+            raise HTTPException(status_code=400, detail="Cannot move a category under itself or its subcategories")
+
+    # Detach the subtree from its old ancestors
+    db.exec(
+        delete(CategoryClosure)
+        .where(CategoryClosure.descendantID.in_(subtree_ids))
+        .where(CategoryClosure.ancestorID.notin_(subtree_ids))
+    )
+
+    # Attach it under every ancestor of the new parent
+    if data.parentID is not None:
+        new_ancestors = db.exec(
+            select(CategoryClosure.ancestorID, CategoryClosure.depth)
+            .where(CategoryClosure.descendantID == data.parentID)
+        ).all()
+        rows = [
+            {"ancestorID": ancestor_id, "descendantID": descendant_id, "depth": ancestor_depth + descendant_depth + 1}
+            for ancestor_id, ancestor_depth in new_ancestors
+            for descendant_id, descendant_depth in subtree
+        ]
+        db.exec(insert(CategoryClosure), params=rows)
+
+    # Rewrite the stored paths of the moved subtree
+    old_path = category.path or ""
+    new_path = get_full_path(db, data.parentID) + "/" + category.name
+    category.parentID = data.parentID
+    for subcategory in db.exec(select(Category).where(Category.categoryID.in_(subtree_ids))).all():
+        if subcategory.path and subcategory.path.startswith(old_path):
+            subcategory.path = new_path + subcategory.path[len(old_path):]
+
+    change_versions.bump(db, "category")
+    db.commit()
+    db.refresh(category)
+    return {"message": "Category moved", "category": category}
+
 # Assign Category to Product (Admin Only)
 @app.post("/assign-category")
 def assign_categories(data: CategoryAssignment, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
@@ -886,6 +1867,7 @@ def assign_categories(data: CategoryAssignment, current_user: dict = Depends(get
     for category_id in data.categoryIDs:
         db.add(Cat_prod(productID=data.productID, categoryID=category_id))
 
+    change_versions.bump(db, "products")
     db.commit()
     return {"message": "Categories assigned successfully"}
 
@@ -902,6 +1884,7 @@ def assign_mul_prod_categories(data: MulProdCategoryAssignment, current_user: di
     for product_id in data.productIDs:
         db.add(Cat_prod(productID=product_id, categoryID=data.categoryID))
 
+    change_versions.bump(db, "products")
     db.commit()
     return {"message": "Categories assigned successfully"}
 
@@ -918,52 +1901,220 @@ def delete_cat_prod(data: DeleteCatProdRequest, current_user: dict = Depends(get
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Access denied")
 
-    # Check if the direct mapping exists
-    #cat_prod = db.exec(select(Cat_prod).where(Cat_prod.productID == data.productID).where(Cat_prod.categoryID == data.categoryID)).all()
-    cat_prod=False
-    if not cat_prod:
-        # If not found, check in subcategories
-        subcategory_ids = get_all_subcategory_ids(data.categoryID, db)
-        cat_prod = db.exec(select(Cat_prod).where(Cat_prod.productID == data.productID).where(Cat_prod.categoryID.in_(subcategory_ids))).all()
-        
-        if not cat_prod:
-            raise HTTPException(status_code=404, detail="Record not found")
+    # Unassign the category and its whole subtree in one statement
+    subcategory_ids = get_all_subcategory_ids(data.categoryID, db)
+    deleted = db.exec(delete(Cat_prod).where(Cat_prod.productID == data.productID, Cat_prod.categoryID.in_(subcategory_ids))).rowcount
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Record not found")
 
-    # Delete all found mappings
-    for mapping in cat_prod:
-        db.delete(mapping)
-    
+    change_versions.bump(db, "products")
     db.commit()
-    return {"message": "Records deleted successfully"}
+    return {"message": "Records deleted successfully", "deleted": {"category_links": deleted}}
+
+@app.delete("/unassign-mul-prod-category")
+def unassign_mul_prod_categories(data: MulProdCategoryAssignment, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    # Counterpart of /assign-mul-prod-category; also removes links to the category's subcategories
+    # A chunk of products per transaction keeps the row locks short, so this is not atomic:
+    # if a chunk fails, the earlier ones stay removed and the error reports how many links that was
+    subcategory_ids = get_all_subcategory_ids(data.categoryID, db)
+    committed = pending = 0
+    try:
+        for chunk in id_chunks(data.productIDs):
+            if pending:
+                db.commit()
+                committed, pending = committed + pending, 0
+            pending = db.exec(delete(Cat_prod).where(Cat_prod.productID.in_(chunk), Cat_prod.categoryID.in_(subcategory_ids))).rowcount
+        if committed or pending:
+            change_versions.bump(db, "products")  # Once, in the last chunk's transaction
+        db.commit()
+        committed, pending = committed + pending, 0
+    except SQLAlchemyError:
+        db.rollback()
+        if committed:
+            change_versions.bump_committed("products")
+        raise HTTPException(status_code=500, detail={
+            "message": f"Removing category assignments failed after {committed} were removed; the rest are unchanged",
+            "deleted": {"category_links": committed},
+        })
+
+    if not committed:
+        raise HTTPException(status_code=404, detail="Record not found")
+    return {"message": f"{committed} category assignments removed", "deleted": {"category_links": committed}}
+
+def format_variation(option: ProductOption, option_values: List[ProductOptionValue]) -> dict:
+    return {
+        "option_id": option.id,
+        "option": option.title,
+        "type": option.type,
+        "is_required": option.is_required,
+        "status": option.status,
+        "values": [option_value_dict(value) for value in option_values]
+    }
+
+MAX_VARIATION_BATCH = 200
+
+@app.get("/get-product-variations", dependencies=[Depends(catalog_cache("products", "stock"))])
+async def get_products_variations(
+    ids: str = Query(..., description="Comma-separated product IDs, e.g. 1,2,3"),
+    db: AsyncSession = Depends(async_read_db("products", "stock"))
+):
+    try:
+        product_ids = list(dict.fromkeys(int(product_id) for product_id in ids.split(",") if product_id.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+    if not product_ids:
+        raise HTTPException(status_code=400, detail="No product IDs given")
+    if len(product_ids) > MAX_VARIATION_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_VARIATION_BATCH} product IDs per request")
+
+    options = await db.run_sync(load_product_options, product_ids)
+    return {
+        "variations": {
+            product_id: [format_variation(option, option_values) for option, option_values in product_options]
+            for product_id, product_options in options.items()
+        }
+    }
 
-@app.get("/get-product-variations/{product_id}")
+@app.get("/get-product-variations/{product_id}", dependencies=[Depends(catalog_cache("products", "stock"))])
 async def get_product_variations(
     product_id: int, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(async_read_db("products", "stock"))
 ):
-    product_options = db.query(ProductOption).filter(ProductOption.productID == product_id).all()
+    product_options = (await db.run_sync(load_product_options, [product_id]))[product_id]
 
     if not product_options:
         raise HTTPException(status_code=404, detail="No variations found for this product")
 
-    variations = []
-    for option in product_options:
-        option_values = db.query(ProductOptionValue).filter(ProductOptionValue.product_option_id == option.id).all()
-        variations.append({
-            "option_id": option.id,
-            "option": option.title,
-            "type": option.type,
-            "is_required": option.is_required,
-            "status": option.status,
-            "values": [{"id": value.id, "title": value.title, "price": value.price, "sku": value.sku, "quantity": value.quantity} for value in option_values]
-        })
-    print("************************", variations)
+    variations = [format_variation(option, option_values) for option, option_values in product_options]
     return {"product_id": product_id, "variations": variations}
 
 
 
+def sync_product_categories(db: Session, product_id: int, category_ids: List[int]) -> dict:
+    """Make the product's categories exactly category_ids; returns what was added and removed"""
+    wanted = set(category_ids)
+    found = set(db.exec(select(Category.categoryID).where(Category.categoryID.in_(wanted))).all()) if wanted else set()
+    missing = sorted(wanted - found)
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Category ID {', '.join(map(str, missing))} not found")
+
+    current = set(db.exec(select(Cat_prod.categoryID).where(Cat_prod.productID == product_id)).all())
+    added, removed = sorted(wanted - current), sorted(current - wanted)
+    if removed:
+        db.exec(delete(Cat_prod).where(Cat_prod.productID == product_id, Cat_prod.categoryID.in_(removed)))
+    if added:
+        db.exec(insert(Cat_prod), params=[{"productID": product_id, "categoryID": category_id} for category_id in added])
+    return {"added": added, "removed": removed}
+
+OPTION_FIELDS = ("title", "type", "is_required", "status")
+VALUE_FIELDS = ("title", "price", "sku", "quantity")
+
+def _whole_number(value) -> int:
+    """An int from JSON given as a number or a string, such as 3, 3.0 or '3'"""
+    number = Decimal(str(value))
+    if number != number.to_integral_value():
+        raise ValueError(f"{value} is not a whole number")
+    return int(number)
+
+def _row_id(value) -> Optional[int]:
+    return _whole_number(value) if value not in (None, "", 0) else None
+
+def sync_product_variations(db: Session, product_id: int, variations_data: list) -> dict:
+    """Reconcile the product's options and values with the edited variations.
+
+    Everything is loaded in two queries and compared in memory; only the differences are
+    written, with one statement per kind of change. Returns the ids touched.
+    """
+    try:
+        incoming = [
+            (
+                _row_id(variation.get("option_id")),
+                {
+                    "title": variation["option"],
+                    "type": variation.get("type", "dropdown"),
+                    "is_required": variation.get("is_required", "yes"),
+                    "status": variation.get("status", "active"),
+                },
+                [
+                    (_row_id(value.get("id")), {"title": value["title"], "price": Decimal(str(value.get("price") or 0)), "sku": value["sku"], "quantity": _whole_number(value["quantity"])})
+                    for value in variation["values"]
+                ],
+            )
+            for variation in variations_data
+        ]
+    except (KeyError, TypeError, ValueError, AttributeError, ArithmeticError):
+        raise HTTPException(status_code=400, detail="Invalid variations format")
+
+    existing = {option.id: (option, {value.id: value for value in values}) for option, values in load_product_options(db, [product_id])[product_id]}
+    foreign = [option_id for option_id, _, _ in incoming if option_id and option_id not in existing]
+    foreign += [
+        value_id
+        for option_id, _, values in incoming if option_id in existing
+        for value_id, _ in values if value_id and value_id not in existing[option_id][1]
+    ]
+    if foreign:
+        raise HTTPException(status_code=400, detail=f"Options or values {', '.join(map(str, foreign))} do not belong to this product")
+
+    kept_options = {option_id for option_id, _, _ in incoming if option_id}
+    removed_options = sorted(set(existing) - kept_options)
+    removed_values, updated_options, updated_values = [], [], []
+    new_options, new_values = [], []  # (option object or id, fields)
+    for option_id, option_fields, values in incoming:
+        if not option_id:
+            option = ProductOption(productID=product_id, **option_fields)
+            new_options.append(option)
+            new_values.extend((option, value_fields) for _, value_fields in values)
+            continue
+
+        option, current_values = existing[option_id]
+        if any(getattr(option, field) != option_fields[field] for field in OPTION_FIELDS):
+            updated_options.append({"id": option_id, **option_fields})
+        kept_values = {value_id for value_id, _ in values if value_id}
+        removed_values.extend(sorted(set(current_values) - kept_values))
+        for value_id, value_fields in values:
+            if not value_id:
+                new_values.append((option_id, value_fields))
+            elif any(getattr(current_values[value_id], field) != value_fields[field] for field in VALUE_FIELDS):
+                updated_values.append({"id": value_id, **value_fields})
+
+    if removed_values or removed_options:
+        db.exec(delete(ProductOptionValue).where(or_(
+            ProductOptionValue.id.in_(removed_values),
+            ProductOptionValue.product_option_id.in_(removed_options),
+        )))
+    if removed_options:
+        db.exec(delete(ProductOption).where(ProductOption.id.in_(removed_options)))
+    if updated_options:
+        db.exec(update(ProductOption), params=updated_options)  # Bulk UPDATE by primary key
+    if updated_values:
+        db.exec(update(ProductOptionValue), params=updated_values)
+    if new_options:
+        db.add_all(new_options)
+        db.flush()  # Ids for the new options' values
+    if new_values:
+        db.exec(insert(ProductOptionValue), params=[
+            {"product_option_id": option if isinstance(option, int) else option.id, **value_fields}
+            for option, value_fields in new_values
+        ])
+
+    return {
+        "options": {
+            "added": [option.id for option in new_options],
+            "updated": [option["id"] for option in updated_options],
+            "removed": removed_options,
+        },
+        "values": {
+            "added": len(new_values),
+            "updated": [value["id"] for value in updated_values],
+            "removed": removed_values,
+        },
+    }
+
 @app.put("/update-product/{product_id}")
-async def update_product(
+def update_product(
     product_id: int,
     name: str = Form(...),
     description: str = Form(...),
@@ -982,6 +2133,8 @@ async def update_product(
     existing_product = db.get(Products, product_id)
     if not existing_product:
         raise HTTPException(status_code=404, detail="Product not found")
+    if db.exec(select(Products.productID).where(Products.SKU == SKU, Products.productID != product_id)).first():
+        raise HTTPException(status_code=400, detail="SKU already exists")
 
     existing_product.name = name
     existing_product.description = description
@@ -989,15 +2142,7 @@ async def update_product(
     existing_product.price = price
     existing_product.quantity = quantity
 
-    # Remove old category assignments
-    db.query(Cat_prod).filter(Cat_prod.productID == product_id).delete()
-
-    # Assign new categories
-    for category_id in category_ids:
-        category = db.get(Category, category_id)
-        if not category:
-            raise HTTPException(status_code=400, detail=f"Category ID {category_id} not found")
-        db.add(Cat_prod(productID=product_id, categoryID=category_id))
+    changes = {"categories": sync_product_categories(db, product_id, category_ids)}
 
     # Save the new image if provided
     if image:
@@ -1006,7 +2151,7 @@ async def update_product(
         file_path = os.path.join(UPLOAD_DIR, file_name)
 
         with open(file_path, "wb") as buffer:
-            buffer.write(await image.read())  # Save file
+            buffer.write(image.file.read())  # Save file
 
         # Update the image path in the database
         existing_product.image_path = f"/assets/images/{file_name}"
@@ -1017,90 +2162,12 @@ async def update_product(
             variations_data = json.loads(variations)  # Parse JSON string into a Python object
         except json.JSONDecodeError:
             raise HTTPException(status_code=400, detail="Invalid variations format")
+        changes.update(sync_product_variations(db, product_id, variations_data))
 
-        # Get all existing options and values for the product
-        existing_options = db.query(ProductOption).filter(ProductOption.productID == product_id).all()
-        existing_option_ids = {option.id for option in existing_options}
-
-        # Get all option IDs and value IDs from the frontend data
-        frontend_option_ids = {variation.get("option_id") for variation in variations_data if variation.get("option_id")}
-        frontend_value_ids = {
-            value.get("id")
-            for variation in variations_data
-            for value in variation["values"]
-            if value.get("id")
-        }
-
-        # Delete options that are not in the frontend data
-        options_to_delete = existing_option_ids - frontend_option_ids
-        if options_to_delete:
-            db.query(ProductOptionValue).filter(ProductOptionValue.product_option_id.in_(options_to_delete)).delete()
-            db.query(ProductOption).filter(ProductOption.id.in_(options_to_delete)).delete()
-
-        # Process each variation from the frontend
-        for variation in variations_data:
-            option_id = variation.get("option_id")
-            if not option_id:  # New option
-                new_option = ProductOption(
-                    productID=product_id,
-                    title=variation["option"],
-                    type=variation.get("type", "dropdown"),
-                    is_required=variation.get("is_required", "yes"),
-                    status=variation.get("status", "active"),
-                )
-                db.add(new_option)
-                db.flush()  # Get the new option ID
-
-                for value in variation["values"]:
-                    db.add(ProductOptionValue(
-                        product_option_id=new_option.id,
-                        title=value["title"],
-                        price=value.get("price", 0),
-                        sku=value["sku"],
-                        quantity=value["quantity"]
-                    ))
-            else:  # Existing option
-                existing_option = db.query(ProductOption).filter(ProductOption.id == option_id).first()
-                if existing_option:
-                    existing_option.title = variation["option"]
-                    existing_option.type = variation.get("type", "dropdown")
-                    existing_option.is_required = variation.get("is_required", "yes")
-                    existing_option.status = variation.get("status", "active")
-
-                    # Get all existing values for this option
-                    existing_values = db.query(ProductOptionValue).filter(ProductOptionValue.product_option_id == option_id).all()
-                    existing_value_ids = {value.id for value in existing_values}
-
-                    # Get all value IDs from the frontend data for this option
-                    frontend_values = variation["values"]
-                    frontend_value_ids_for_option = {value.get("id") for value in frontend_values if value.get("id")}
-
-                    # Delete values that are not in the frontend data
-                    values_to_delete = existing_value_ids - frontend_value_ids_for_option
-                    if values_to_delete:
-                        db.query(ProductOptionValue).filter(ProductOptionValue.id.in_(values_to_delete)).delete()
-
-                    # Update or add values
-                    for value in frontend_values:
-                        value_id = value.get("id")
-                        if not value_id:  # New value
-                            db.add(ProductOptionValue(
-                                product_option_id=option_id,
-                                title=value["title"],
-                                price=value.get("price", 0),
-                                sku=value["sku"],
-                                quantity=value["quantity"]
-                            ))
-                        else:  # Existing value
-                            existing_value = db.query(ProductOptionValue).filter(ProductOptionValue.id == value_id).first()
-                            if existing_value:
-                                existing_value.title = value["title"]
-                                existing_value.price = value.get("price", 0)
-                                existing_value.sku = value["sku"]
-                                existing_value.quantity = value["quantity"]
-
+    change_versions.bump(db, "products")
     db.commit()
-    return {"message": "Product updated successfully"}
+    reindex_products(db, [product_id])
+    return {"message": "Product updated successfully", "changes": changes}
 @app.get("/get-product-categories/{product_id}")
 def get_product_categories(product_id: int, db: Session = Depends(get_db)):
     assigned_categories = db.exec(select(Cat_prod.categoryID).where(Cat_prod.productID == product_id)).all()
@@ -1108,35 +2175,53 @@ def get_product_categories(product_id: int, db: Session = Depends(get_db)):
     # assigned_categories might already be a list of integers, no need for indexing
     return {"assignedCategories": assigned_categories}
 
+DELETE_CHUNK_SIZE = 1000  # Ids per DELETE ... IN statement and per transaction
+
+def id_chunks(ids: List[int], size: int = DELETE_CHUNK_SIZE):
+    unique_ids = sorted(set(ids))
+    for start in range(0, len(unique_ids), size):
+        yield unique_ids[start:start + size]
+
+def delete_products_cascade(db: Session, product_ids: List[int]) -> Dict[str, int]:
+    """Delete products with their options, option values, category links and cart lines.
+
+    The tables declare no foreign keys, so the dependents are deleted explicitly, a chunk of
+    products per transaction. Order lines are history and stay. Returns rows deleted per table.
+    """
+    deleted = {"products": 0, "options": 0, "option_values": 0, "category_links": 0, "cart_lines": 0}
+    for chunk in id_chunks(product_ids):
+        option_ids = select(ProductOption.id).where(ProductOption.productID.in_(chunk))
+        deleted["option_values"] += db.exec(delete(ProductOptionValue).where(ProductOptionValue.product_option_id.in_(option_ids))).rowcount
+        deleted["options"] += db.exec(delete(ProductOption).where(ProductOption.productID.in_(chunk))).rowcount
+        deleted["category_links"] += db.exec(delete(Cat_prod).where(Cat_prod.productID.in_(chunk))).rowcount
+        deleted["cart_lines"] += db.exec(delete(Cart_prod).where(Cart_prod.productID.in_(chunk))).rowcount
+        deleted["products"] += db.exec(delete(Products).where(Products.productID.in_(chunk))).rowcount
+        change_versions.bump(db, "products")
+        db.commit()
+        for product_id in chunk:
+            product_search.remove_product(product_id)
+    return deleted
+
 # Delete product (Accessible to Admin Only)
 @app.delete("/delete-product/{product_id}")
 def delete_product(product_id: int, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Access denied")
 
-    product = db.get(Products, product_id)
-    if not product:
+    deleted = delete_products_cascade(db, [product_id])
+    if not deleted["products"]:
         raise HTTPException(status_code=404, detail="Product not found")
-
-    db.delete(product)
-    db.commit()
-    return {"message": "Product deleted successfully"}
+    return {"message": "Product deleted successfully", "deleted": deleted}
 
 @app.delete("/delete-products")
 def delete_products(data: DeleteProductsRequest, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
     if current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Access denied")
 
-    products_to_delete = db.query(Products).filter(Products.productID.in_(data.product_ids)).all()
-    
-    if not products_to_delete:
+    deleted = delete_products_cascade(db, data.product_ids)
+    if not deleted["products"]:
         raise HTTPException(status_code=404, detail="No products found to delete")
-
-    for product in products_to_delete:
-        db.delete(product)
-    
-    db.commit()
-    return {"message": f"{len(products_to_delete)} products deleted successfully"}
+    return {"message": f"{deleted['products']} products deleted successfully", "deleted": deleted}
 
 @app.post("/refresh")
 def refresh_access_token(refresh_token: str = Depends(oauth2_refresh_scheme)):
@@ -1214,7 +2299,7 @@ def signup(customer: CustomerSignup, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Email already registered")
 
     # Hash the password
-    hashed_password = pwd_context.hash(customer.password)
+    hashed_password = password_hasher.hash_sync(customer.password)
 
     # Create new customer record
     new_customer = Customer(Name=customer.name, Email=customer.email, Password=hashed_password)
@@ -1229,7 +2314,7 @@ def signup(customer: CustomerSignup, db: Session = Depends(get_db)):
 def add_customer(user_data: CustomerCreate, db: Session = Depends(get_db)):
 
 
-    hashed_password = hash_password(user_data.password)
+    hashed_password = password_hasher.hash_sync(user_data.password)
 
     new_customer = Customer(
         FirstName=user_data.firstname,
@@ -1256,12 +2341,11 @@ def add_customer(user_data: CustomerCreate, db: Session = Depends(get_db)):
 def update_customer(customer_id: int, user_data: CustomerCreate, current_user: dict = Depends(get_current_user),  db: Session = Depends(get_db)):
 
     
+    authorize_customer(current_user, customer_id)
     existing_customer = db.get(Customer, customer_id)
     
     if not existing_customer:
         raise HTTPException(status_code=404, detail="User not found")
-    if(current_user["email"]!=existing_customer.Email):
-        raise HTTPException(status_code=403, detail="Access denied")
     
 
     existing_customer.FirstName = user_data.firstname
@@ -1278,17 +2362,23 @@ import json
 
 
 
+def options_hash(selected_options) -> str:
+    """Stable digest of a line's selected options, independent of key order.
+
+    Accepts the options dict or the serialized JSON string stored in selected_options.
+    """
+    if isinstance(selected_options, str):
+        selected_options = json.loads(selected_options) if selected_options else None
+    canonical = json.dumps(selected_options or {}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
 @app.post("/add-product-cart")
 def add_product_to_cart(
     data: AddProductToCartRequest,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    existing_customer = db.get(Customer, data.customerID)
-    if not existing_customer:
-        raise HTTPException(status_code=404, detail="User not found")
-    if current_user["email"] != existing_customer.Email:
-        raise HTTPException(status_code=403, detail="Access denied")
+    authorize_customer(current_user, data.customerID)
 
     # Fetch the active cart
     cart = db.exec(
@@ -1304,31 +2394,22 @@ def add_product_to_cart(
         db.refresh(new_cart)
         cart = new_cart
 
-    # Serialize the selected_options to a JSON string for consistent comparison
+    # Serialize the selected_options to a JSON string for consistent storage
     serialized_options = json.dumps(data.selected_options, sort_keys=True)
 
-    # Check if a cart_prod entry for the same product and options exists
-    existing_cart_prod = db.exec(
-        select(Cart_prod)
-        .where(Cart_prod.cartID == cart.cartID)
-        .where(Cart_prod.productID == data.productID)
-        .where(Cart_prod.selected_options == serialized_options)
-    ).first()
-
-    if existing_cart_prod:
-        # Update quantity and price
-        existing_cart_prod.quantity += data.quantity
-        existing_cart_prod.price = data.price
-    else:
-        # Add new product to cart with selected options
-        new_cart_prod = Cart_prod(
-            cartID=cart.cartID,
-            productID=data.productID,
-            quantity=data.quantity,
-            price=data.price,
-            selected_options=serialized_options  # Store serialized JSON
-        )
-        db.add(new_cart_prod)
+    # One indexed upsert: a line with the same product and options gets the quantity added
+    stmt = mysql_insert(Cart_prod).values(
+        cartID=cart.cartID,
+        productID=data.productID,
+        quantity=data.quantity,
+        price=data.price,
+        selected_options=serialized_options,  # Store serialized JSON
+        options_hash=options_hash(data.selected_options),
+    )
+    db.exec(stmt.on_duplicate_key_update(
+        quantity=Cart_prod.quantity + stmt.inserted.quantity,
+        price=stmt.inserted.price,
+    ))
 
     db.commit()
     return {"message": "Product added to cart successfully"}
@@ -1336,29 +2417,19 @@ def add_product_to_cart(
 
 
 @app.get("/cart", response_model=list[CartItemResponse])
-def get_cart_items(customerID: int = Query(..., description="Customer ID"), current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
-
-    existing_customer = db.get(Customer, customerID)
-    
-    if not existing_customer:
-        raise HTTPException(status_code=404, detail="User not found")
-    if(current_user["email"]!=existing_customer.Email):
-        raise HTTPException(status_code=403, detail="Access denied")
+async def get_cart_items(customerID: int = Query(..., description="Customer ID"), current_user: dict = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
 
-    # Get cart for the given customerID
-    cart = db.exec(select(Cart).where(Cart.customerID == customerID).where(Cart.status == "active")).first()
-    if not cart:
-        return []
+    authorize_customer(current_user, customerID)
 
-    # Get products in the user's cart
-    cart_items = (
-        db.query(Cart_prod, Products)
+    # Get products in the user's active cart
+    cart_items = (await db.exec(
+        select(Cart_prod, Products)
+        .join(Cart, Cart.cartID == Cart_prod.cartID)
         .join(Products, Cart_prod.productID == Products.productID)
-        .filter(Cart_prod.cartID == cart.cartID)
-        .all()
-    )
-    
-    print("Raw cart_items:", cart_items)
+        .where(Cart.customerID == customerID)
+        .where(Cart.status == "active")
+    )).all()
+
     # Format response
     cart_response = [
         {
@@ -1373,18 +2444,12 @@ def get_cart_items(customerID: int = Query(..., description="Customer ID"), curr
         }
         for cart_item, product in cart_items
     ]
-    print('^^^^^%%%%%%%%%%%%%',cart_response)
     return cart_response
 
 @app.delete("/remove-cart-item")
 def remove_cart_item(customerID: int = Query(..., description="Customer ID"), id: int = Query(..., description="ID"), current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
     
-    existing_customer = db.get(Customer, customerID)
-    
-    if not existing_customer:
-        raise HTTPException(status_code=404, detail="User not found")
-    if(current_user["email"]!=existing_customer.Email):
-        raise HTTPException(status_code=403, detail="Access denied")
+    authorize_customer(current_user, customerID)
 
     # Get cart for the given customerID
     cart =db.exec(select(Cart).where(Cart.customerID == customerID).where(Cart.status == "active")).first()
@@ -1404,12 +2469,7 @@ def remove_cart_item(customerID: int = Query(..., description="Customer ID"), id
 
 @app.put("/update-cart-item")
 def update_cart_item(data: UpdateCartItemRequest, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
-    existing_customer = db.get(Customer, data.customerID)
-    
-    if not existing_customer:
-        raise HTTPException(status_code=404, detail="User not found")
-    if current_user["email"] != existing_customer.Email:
-        raise HTTPException(status_code=403, detail="Access denied")
+    authorize_customer(current_user, data.customerID)
 
     # Get cart for the given customerID
     cart = db.exec(select(Cart).where(Cart.customerID == data.customerID).where(Cart.status == "active")).first()
@@ -1433,12 +2493,7 @@ class ClearCartRequest(BaseModel):
 def clear_cart(request: ClearCartRequest, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
     customerID = request.customerID  # Extract from request body
     
-    existing_customer = db.get(Customer, customerID)
-    if not existing_customer:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    if current_user["email"] != existing_customer.Email:
-        raise HTTPException(status_code=403, detail="Access denied")
+    authorize_customer(current_user, customerID)
 
     # Get active cart for the given customerID
     cart = db.exec(select(Cart).where(Cart.customerID == customerID).where(Cart.status == "active")).first()
@@ -1452,13 +2507,7 @@ def clear_cart(request: ClearCartRequest, current_user: dict = Depends(get_curre
     return {"message": "Cart cleared successfully"}
 @app.post("/add-address")
 def add_address(address: AddressCreate, current_user: dict = Depends(get_current_user),  db: Session = Depends(get_db)):
-    existing_customer = db.get(Customer, address.customerID)
-    
-    if not existing_customer:
-        raise HTTPException(status_code=404, detail="User not found")
-    if(current_user["email"]!=existing_customer.Email):
-        
-        raise HTTPException(status_code=403, detail="Access denied")
+    authorize_customer(current_user, address.customerID)
     new_address = Address(**address.dict())
     db.add(new_address)
     db.commit()
@@ -1468,23 +2517,17 @@ def add_address(address: AddressCreate, current_user: dict = Depends(get_current
 
 
 @app.get("/view-addresses")
-def get_addresses(
+async def get_addresses(
     customerID: int = Query(..., description="Customer ID"), 
     current_user: dict = Depends(get_current_user), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
     ):
     # Check if the customer exists
-    existing_customer = db.get(Customer, customerID)
-    if not existing_customer:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    # Ensure the logged-in user is only accessing their own addresses
-    if current_user["email"] != existing_customer.Email:
-        raise HTTPException(status_code=403, detail="Access denied")
+    authorize_customer(current_user, customerID)
 
     # Fetch all addresses and join with ShippingRate to get country_name
     addresses = (
-        db.exec(
+        (await db.exec(
             select(
                 Address.addressID,
                 Address.customerID,
@@ -1501,7 +2544,7 @@ def get_addresses(
             )
             .join(ShippingRate, ShippingRate.id == Address.countryID)
             .where(Address.customerID == customerID)
-        )
+        ))
         .all()
     )
 
@@ -1509,11 +2552,10 @@ def get_addresses(
     address_list = [dict(zip(row._fields, row)) for row in addresses]
 
     return jsonable_encoder(address_list)
-@app.get("/countries", tags=["Address"])
-def get_countries(db: Session = Depends(get_db)):
+@app.get("/countries", tags=["Address"], dependencies=[Depends(catalog_cache("shipping_rates"))])
+async def get_countries(db: AsyncSession = Depends(async_read_db("shipping_rates"))):
     """Fetch all countries from shipping_rates table"""
-    countries = db.exec(select(ShippingRate)).all()
-    print(countries)
+    countries = (await db.exec(select(ShippingRate))).all()
     return [{"id": country.id, "name": country.country_name} for country in countries]
 
 
@@ -1522,12 +2564,7 @@ def update_address(addressID: int, address: AddressCreate, current_user: dict =
     existing_address = db.get(Address, addressID)
     if not existing_address:
         raise HTTPException(status_code=404, detail="Address not found")
-    existing_customer = db.get(Customer, existing_address.customerID)
-    if not existing_customer:
-        raise HTTPException(status_code=404, detail="User not found")
-    if(current_user["email"]!=existing_customer.Email):
-        
-        raise HTTPException(status_code=403, detail="Access denied")
+    authorize_customer(current_user, existing_address.customerID)
     existing_address.name = address.name
     existing_address.building_name = address.building_name
     existing_address.countryID = address.countryID
@@ -1545,12 +2582,7 @@ def delete_address(addressID: int, current_user: dict = Depends(get_current_user
     existing_address = db.get(Address, addressID)
     if not existing_address:
         raise HTTPException(status_code=404, detail="Address not found")
-    existing_customer = db.get(Customer, existing_address.customerID)
-    if not existing_customer:
-        raise HTTPException(status_code=404, detail="User not found")
-    if(current_user["email"]!=existing_customer.Email):
-        
-        raise HTTPException(status_code=403, detail="Access denied")
+    authorize_customer(current_user, existing_address.customerID)
     db.delete(existing_address)
     db.commit()
     return {"message": "Address deleted successfully"}
@@ -1562,14 +2594,279 @@ def get_shipping_rate(country_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Shipping rate not found for this country")
     return {"shipping_cost": float(rate.shipping_cost)}
 
+EMAIL_DISPATCHER_ENABLED = os.getenv("EMAIL_DISPATCHER_ENABLED", "True") == "True"
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "20"))
+EMAIL_POLL_SECONDS = 1.0
+EMAIL_MAX_ATTEMPTS = 6
+EMAIL_BACKOFF_SECONDS = 30  # Doubles after every failed attempt
+EMAIL_LEASE = timedelta(minutes=5)  # A "sending" row whose lease ran out is retried
+email_dispatcher: Optional[asyncio.Task] = None
+
+def queue_email(db: Session, email: EmailSchema, attachment_path: Optional[str] = None):
+    """Add an email to the outbox; it is sent only if the caller's transaction commits"""
+    db.add(EmailOutbox(
+        recipient=email.email,
+        subject=email.subject,
+        body=email.body,
+        attachment_path=attachment_path,
+        next_attempt_at=datetime.datetime.now(),
+    ))
+
+def claim_outbox_batch(limit: int) -> List[EmailOutbox]:
+    now = datetime.datetime.now()
+    with Session(engine, expire_on_commit=False) as db:
+        # SKIP LOCKED lets several dispatchers drain the outbox without sending a row twice
+        rows = db.exec(
+            select(EmailOutbox)
+            .where(EmailOutbox.status.in_(["pending", "sending"]))
+            .where(EmailOutbox.next_attempt_at <= now)
+            .order_by(EmailOutbox.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        ).all()
+        for row in rows:
+            row.status = "sending"
+            row.attempts += 1
+            row.next_attempt_at = now + EMAIL_LEASE
+        db.commit()
+        return rows
+
+def record_outbox_results(results: List[Tuple[int, Optional[Exception]]]):
+    now = datetime.datetime.now()
+    with Session(engine) as db:
+        rows = {row.id: row for row in db.exec(select(EmailOutbox).where(EmailOutbox.id.in_([outbox_id for outbox_id, _ in results]))).all()}
+        for outbox_id, error in results:
+            row = rows[outbox_id]
+            if error is None:
+                row.status = "sent"
+                row.sent_at = now
+                row.last_error = None
+            elif row.attempts >= EMAIL_MAX_ATTEMPTS:
+                row.status = "dead"  # Dead-lettered; kept for inspection and manual resend
+                row.last_error = str(error)[:500]
+                print(f"❌ Giving up on email #{outbox_id} to {row.recipient}: {error}")
+            else:
+                row.status = "pending"
+                row.next_attempt_at = now + timedelta(seconds=EMAIL_BACKOFF_SECONDS * 2 ** (row.attempts - 1))
+                row.last_error = str(error)[:500]
+        db.commit()
+
+async def run_email_dispatcher():
+    """Drain the outbox in batches; concurrency is bounded by the mailer's connection pool"""
+    while True:
+        try:
+            batch = await run_in_threadpool(claim_outbox_batch, EMAIL_BATCH_SIZE)
+            if not batch:
+                await asyncio.sleep(EMAIL_POLL_SECONDS)
+                continue
+            # Attachments are read from disk, so build the messages off the event loop
+            messages = await run_in_threadpool(lambda: [
+                build_message(EmailSchema(email=row.recipient, subject=row.subject, body=row.body), row.attachment_path)
+                for row in batch
+            ])
+            errors = await mailer.send_many(messages)
+            await run_in_threadpool(record_outbox_results, [(row.id, error) for row, error in zip(batch, errors)])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"❌ Email dispatcher error: {e}")
+            await asyncio.sleep(EMAIL_POLL_SECONDS)
+
+@app.on_event("startup")
+async def start_email_dispatcher():
+    global email_dispatcher
+    if EMAIL_DISPATCHER_ENABLED:
+        email_dispatcher = asyncio.create_task(run_email_dispatcher())
+
+@app.on_event("shutdown")
+async def stop_email_dispatcher():
+    if email_dispatcher:
+        email_dispatcher.cancel()
+
+INVOICE_WORKERS = int(os.getenv("INVOICE_WORKERS", "2"))
+INVOICE_MAX_ATTEMPTS = 3
+INVOICE_STALE_AFTER = timedelta(minutes=10)  # A job still "rendering" after this was lost with its process
+INVOICE_SWEEP_SECONDS = 60.0
+invoice_pool: Optional[ProcessPoolExecutor] = None
+invoice_tasks: set = set()  # Keep references to recovery tasks until they finish
+invoice_sweeper: Optional[asyncio.Task] = None
+
+def build_invoice_details(db: Session, order_id: int) -> dict:
+    order = db.get(Orders, order_id)
+    customer = db.get(Customer, order.customerID)
+    address = db.exec(select(OrderAddress).where(OrderAddress.orderID == order_id)).first()
+    order_products = db.exec(
+        select(Order_prod, Products)
+        .join(Products, Order_prod.productID == Products.productID)
+        .where(Order_prod.orderID == order_id)
+    ).all()
+    return {
+        "orderID": order.orderID,
+        "customer_name": f"{customer.FirstName} {customer.LastName}",
+        "customerEmail": customer.Email,
+        "customerPhone": customer.PhoneNumber,
+        "delivery_address": f"{address.name}, {address.street}, {address.city}, {address.state}, - {address.pincode}",
+        "total_price": order.total_price,
+        "products": [
+            {"name": product.name, "quantity": order_prod.quantity, "price": order_prod.price}
+            for order_prod, product in order_products
+        ]
+    }
+
+def claim_invoice_job(job_id: int) -> Optional[dict]:
+    """Mark a pending job as rendering and return its invoice details, or None if another worker has it"""
+    with Session(engine) as db:
+        claimed = db.exec(
+            update(InvoiceJob)
+            .where(InvoiceJob.id == job_id, InvoiceJob.status == "pending")
+            .values(status="rendering", attempts=InvoiceJob.attempts + 1)
+        ).rowcount
+        if not claimed:
+            return None
+        job = db.get(InvoiceJob, job_id)
+        details = build_invoice_details(db, job.orderID)
+        db.commit()
+        return details
+
+def finish_invoice_job(job_id: int, details: dict, invoice_path: Optional[str], error: Optional[str]) -> InvoiceJob:
+    with Session(engine) as db:
+        job = db.get(InvoiceJob, job_id)
+        if error is None:
+            job.status = "done"
+            job.error = None
+            db.get(Orders, job.orderID).invoice_path = invoice_path
+        else:
+            job.status = "pending" if job.attempts < INVOICE_MAX_ATTEMPTS else "failed"
+            job.error = error[:500]
+
+        if job.status != "pending":
+            # Send confirmation email, with the invoice when it rendered
+            email = EmailSchema(
+                email=details["customerEmail"],
+                subject="Order Confirmation",
+                body=f"<h1>Thank you for your order #{details['orderID']}!</h1><p>Your order has been placed successfully.</p>"
+            )
+            queue_email(db, email, invoice_path)
+        db.commit()
+        db.refresh(job)
+        return job
+
+async def run_invoice_job(job_id: int):
+    """Render an order's invoice in the process pool, store its path and queue the confirmation email"""
+    loop = asyncio.get_running_loop()
+    while True:
+        details = await run_in_threadpool(claim_invoice_job, job_id)
+        if details is None:
+            return
+
+        started = time.perf_counter()
+        try:
+            invoice_path = await loop.run_in_executor(invoice_pool, generate_invoice, details)
+            INVOICE_RENDER_SECONDS.observe(time.perf_counter() - started, "done")
+            job = await run_in_threadpool(finish_invoice_job, job_id, details, invoice_path, None)
+        except Exception as e:
+            INVOICE_RENDER_SECONDS.observe(time.perf_counter() - started, "failed")
+            job = await run_in_threadpool(finish_invoice_job, job_id, details, None, str(e))
+            print(f"❌ Invoice for order #{details['orderID']} failed (attempt {job.attempts}): {e}")
+
+        if job.status != "pending":
+            return
+        await asyncio.sleep(2 ** job.attempts)  # Back off, then retry
+
+def recoverable_invoice_job_ids(pending_idle: timedelta) -> List[int]:
+    """Requeue jobs whose worker is gone and return them with the pending jobs idle for pending_idle"""
+    now = datetime.datetime.now()
+    with Session(engine) as db:
+        # A job stuck in rendering past its lease was lost with the process that claimed it
+        job_ids = db.exec(
+            select(InvoiceJob.id).where(or_(
+                and_(InvoiceJob.status == "rendering", InvoiceJob.updated_at < now - INVOICE_STALE_AFTER),
+                and_(InvoiceJob.status == "pending", InvoiceJob.updated_at <= now - pending_idle),
+            ))
+        ).all()
+        if job_ids:
+            db.exec(
+                update(InvoiceJob)
+                .where(InvoiceJob.id.in_(job_ids), InvoiceJob.status == "rendering")
+                .values(status="pending")
+            )
+            db.commit()
+        return job_ids
+
+def start_invoice_jobs(job_ids: List[int]):
+    for job_id in job_ids:
+        task = asyncio.create_task(run_invoice_job(job_id))
+        invoice_tasks.add(task)
+        task.add_done_callback(invoice_tasks.discard)
+
+async def sweep_invoice_jobs():
+    # Picks up jobs lost by a worker that died while this one keeps running
+    while True:
+        await asyncio.sleep(INVOICE_SWEEP_SECONDS)
+        try:
+            start_invoice_jobs(await run_in_threadpool(recoverable_invoice_job_ids, INVOICE_STALE_AFTER))
+        except Exception as e:
+            print(f"❌ Invoice job sweep failed: {e}")
+
+@app.on_event("startup")
+async def start_invoice_pool():
+    global invoice_pool, invoice_sweeper
+    invoice_pool = ProcessPoolExecutor(max_workers=INVOICE_WORKERS)
+    # Nothing in this process is working on a job yet, so every pending one is picked up
+    start_invoice_jobs(await run_in_threadpool(recoverable_invoice_job_ids, timedelta(0)))
+    invoice_sweeper = asyncio.create_task(sweep_invoice_jobs())
+
+@app.on_event("shutdown")
+def stop_invoice_pool():
+    if invoice_sweeper:
+        invoice_sweeper.cancel()
+    if invoice_pool:
+        invoice_pool.shutdown(wait=True)
+
+@app.on_event("shutdown")
+async def close_mailer():
+    await mailer.close()
+
+# Download an order's invoice, or poll its status while it is being rendered
+@app.get("/invoice/{orderID}")
+def get_invoice(orderID: int, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
+    order = db.get(Orders, orderID)
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    authorize_customer(current_user, order.customerID, allow_admin=True)
+
+    if order.invoice_path and os.path.exists(order.invoice_path):
+        return FileResponse(order.invoice_path, media_type="application/pdf", filename=os.path.basename(order.invoice_path))
+
+    job = db.exec(select(InvoiceJob).where(InvoiceJob.orderID == orderID).order_by(desc(InvoiceJob.id))).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Invoice not found")
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=f"Invoice generation failed: {job.error}")
+    return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content={"orderID": orderID, "status": job.status, "attempts": job.attempts})
+
+def decrement_stock(db: Session, id_column, quantity_column, needed: Dict[int, int]) -> bool:
+    """Atomically take stock for many rows in one UPDATE.
+
+    Only rows holding enough stock match, so the update is all-or-nothing when the
+    caller rolls back on False. Rows with NULL quantity are not stock-tracked and
+    stay NULL.
+    """
+    if not needed:
+        return True
+    amount = case(needed, value=id_column)
+    result = db.exec(
+        update(id_column.class_)
+        .where(id_column.in_(list(needed)))
+        .where(or_(quantity_column.is_(None), quantity_column >= amount))
+        .values({quantity_column: quantity_column - amount})
+    )
+    return result.rowcount == len(needed)
+
 @app.post("/create-order")
 def create_order(order_data: orderCreate, background_tasks: BackgroundTasks, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
     try:
-        existing_customer = db.get(Customer, order_data.customerID)
-        if not existing_customer:
-            raise HTTPException(status_code=404, detail="User not found")
-        if current_user["email"] != existing_customer.Email:
-            raise HTTPException(status_code=403, detail="Access denied")
+        authorize_customer(current_user, order_data.customerID)
 
         existing_address = db.get(Address, order_data.addressID)
         if not existing_address:
@@ -1587,6 +2884,15 @@ def create_order(order_data: orderCreate, background_tasks: BackgroundTasks, cur
         shipping_cost = float(shipping_rate.shipping_cost)
         total_price = sum([float(cart_item.price) * cart_item.quantity for cart_item in cart_items]) + shipping_cost
 
+        # Preload every product, option and value the cart refers to
+        product_ids = list({cart_item.productID for cart_item in cart_items})
+        products = {product.productID: product for product in db.exec(select(Products).where(Products.productID.in_(product_ids))).all()}
+        option_value_ids: Dict[Tuple[int, str, str], int] = {}
+        for product_id, product_options in load_product_options(db, product_ids).items():
+            for option, option_values in product_options:
+                for value in option_values:
+                    option_value_ids.setdefault((product_id, option.title, value.title), value.id)
+
         # Create the order
         new_order = Orders(
             customerID=order_data.customerID,
@@ -1594,11 +2900,10 @@ def create_order(order_data: orderCreate, background_tasks: BackgroundTasks, cur
             status="pending"
         )
         db.add(new_order)
-        db.commit()
-        db.refresh(new_order)
+        db.flush()  # Get the new order ID
 
         # Add order address
-        order_address = OrderAddress(
+        db.add(OrderAddress(
             orderID=new_order.orderID,
             customerID=new_order.customerID,
             name=existing_address.name,
@@ -1610,110 +2915,79 @@ def create_order(order_data: orderCreate, background_tasks: BackgroundTasks, cur
             street=existing_address.street,
             pincode=existing_address.pincode,
             phone_number=existing_address.phone_number
-        )
-        db.add(order_address)
-        db.commit()
+        ))
 
-        ordered_products = []  # Store product details for invoice
+        order_rows = []
+        product_stock_needed: Dict[int, int] = {}
+        option_stock_needed: Dict[int, int] = {}
+        seen_lines = set()
         for cart_item in cart_items:
-            # Deserialize selected_options if it exists
-            selected_options = json.loads(cart_item.selected_options) if cart_item.selected_options else {}
-
-            # Check if an entry with the same productID, orderID, and selected_options exists
-            existing_orderprod = db.exec(
-                select(Order_prod)
-                .where(Order_prod.orderID == new_order.orderID)
-                .where(Order_prod.productID == cart_item.productID)
-                .where(Order_prod.selected_options == cart_item.selected_options)  # Compare JSON directly
-            ).first()
-
-            if existing_orderprod:
-                continue  # Skip duplicate entries
-
-            # Add new product to the order
-            new_order_prod = Order_prod(
-                orderID=new_order.orderID,
-                productID=cart_item.productID,
-                quantity=cart_item.quantity,
-                price=cart_item.price,
-                selected_options=cart_item.selected_options  # Pass JSON directly
-            )
-            db.add(new_order_prod)
-
-            # Update product option values based on selected options
-            for option_key, option_value in selected_options.items():
-                # Find the corresponding ProductOption entry
-                product_option = db.exec(
-                    select(ProductOption)
-                    .where(ProductOption.productID == cart_item.productID)
-                    .where(ProductOption.title == option_key)
-                ).first()
-
-                if product_option:
-                    # Find the corresponding ProductOptionValue entry
-                    product_option_value = db.exec(
-                        select(ProductOptionValue)
-                        .where(ProductOptionValue.product_option_id == product_option.id)
-                        .where(ProductOptionValue.title == option_value)
-                    ).first()
-
-                    if product_option_value:
-                        # Update the quantity in the ProductOptionValue table
-                        product_option_value.quantity -= cart_item.quantity
-                        if product_option_value.quantity < 0:
-                            raise HTTPException(status_code=400, detail=f"Insufficient stock for option '{option_key}: {option_value}'")
-
-            # Store product details for invoice generation
-            product = db.exec(select(Products).where(Products.productID == cart_item.productID)).first()
-            product.quantity -= cart_item.quantity  # Update product stock
-            ordered_products.append({
-                "name": product.name,
+            # Skip duplicate lines with the same product and options
+            line_key = (cart_item.productID, cart_item.options_hash or options_hash(cart_item.selected_options))
+            if line_key in seen_lines:
+                continue
+            seen_lines.add(line_key)
+
+            product = products.get(cart_item.productID)
+            if not product:
+                raise HTTPException(status_code=404, detail=f"Product {cart_item.productID} not found")
+
+            order_rows.append({
+                "orderID": new_order.orderID,
+                "productID": cart_item.productID,
                 "quantity": cart_item.quantity,
                 "price": cart_item.price,
+                "selected_options": cart_item.selected_options,  # Pass JSON directly
+                "options_hash": line_key[1],
             })
+            product_stock_needed[product.productID] = product_stock_needed.get(product.productID, 0) + cart_item.quantity
 
-        db.commit()
+            # Deserialize selected_options if it exists
+            selected_options = json.loads(cart_item.selected_options) if cart_item.selected_options else {}
+            for option_key, option_value in selected_options.items():
+                value_id = option_value_ids.get((cart_item.productID, option_key, option_value))
+                if value_id:
+                    option_stock_needed[value_id] = option_stock_needed.get(value_id, 0) + cart_item.quantity
+
+        db.exec(insert(Order_prod), params=order_rows)
+
+        # Conditional decrements, so concurrent checkouts cannot oversell
+        if not decrement_stock(db, ProductOptionValue.id, ProductOptionValue.quantity, option_stock_needed):
+            raise HTTPException(status_code=400, detail="Insufficient stock for one of the selected options")
+        if not decrement_stock(db, Products.productID, Products.quantity, product_stock_needed):
+            raise HTTPException(status_code=400, detail="Insufficient stock for one of the products")
 
         # Mark cart as completed
         cart.status = "completed"
-        db.commit()
 
-        # Generate Invoice PDF
-        order_details = {
-            "orderID": new_order.orderID,
-            "customer_name": f"{existing_customer.FirstName} {existing_customer.LastName}",
-            "customerEmail": existing_customer.Email,
-            "customerPhone": existing_customer.PhoneNumber,
-            "delivery_address": f"{existing_address.name}, {existing_address.street}, {existing_address.city}, {existing_address.state}, - {existing_address.pincode}",
-            "total_price": new_order.total_price,
-            "products": ordered_products
-        }
-        invoice_path = generate_invoice(order_details)
-        new_order.invoice_path = invoice_path
+        # The invoice is rendered and mailed by the invoice worker pool after the response
+        invoice_job = InvoiceJob(orderID=new_order.orderID)
+        db.add(invoice_job)
+        db.flush()
+        invoice_job_id = invoice_job.id
         db.commit()
 
-        # Send confirmation email with invoice
-        email = EmailSchema(
-            email=existing_customer.Email,
-            subject="Order Confirmation",
-            body=f"<h1>Thank you for your order #{new_order.orderID}!</h1><p>Your order has been placed successfully.</p>"
-        )
-        background_tasks.add_task(send_email, email, invoice_path)
-
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Order creation failed: {str(e)}")
 
+    # The order is placed from here on, so nothing below may fail the request.
+    # The bump runs after the commit so concurrent checkouts do not queue on the change_versions row.
+    try:
+        change_versions.bump_committed("stock")
+    except Exception as e:
+        print(f"❌ Stock version bump after order #{new_order.orderID} failed: {e}")
+    background_tasks.add_task(run_invoice_job, invoice_job_id)
+
     return {"message": "Order created successfully", "orderID": new_order.orderID, "total_price": new_order.total_price, "status": new_order.status}
 
+# On the primary: a customer opens this right after checkout and must see the new order
 @app.get("/view-orders")
 def view_orders(customerID: int = Query(..., description="Customer ID") , current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
-    existing_customer = db.get(Customer, customerID)
-    if not existing_customer:
-        raise HTTPException(status_code=404, detail="User not found")
-    if(current_user["email"]!=existing_customer.Email):
-        
-        raise HTTPException(status_code=403, detail="Access denied")
+    authorize_customer(current_user, customerID)
 
     orders = db.exec(select(Orders).where(Orders.customerID == customerID)).all()
     return orders
@@ -1727,9 +3001,7 @@ def view_order_products(orderID: int, current_user: dict = Depends(get_current_u
         raise HTTPException(status_code=404, detail="Order not found")
 
     # Verify if the current user is authorized to view the order
-    existing_customer = db.get(Customer, existing_order.customerID)
-    if not existing_customer or current_user["email"] != existing_customer.Email:
-        raise HTTPException(status_code=403, detail="Access denied")
+    authorize_customer(current_user, existing_order.customerID)
 
     # Retrieve the delivery address details
     delivery_address =  db.exec(select(OrderAddress).where(OrderAddress.orderID == orderID)).first()
@@ -1800,16 +3072,14 @@ class UpdateOrderStatusRequest(BaseModel):
     reason:Optional[str] = None
 
 @app.put("/update-order-status/{orderID}")
-def update_order_status(orderID: int, status: UpdateOrderStatusRequest,background_tasks: BackgroundTasks, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
+def update_order_status(orderID: int, status: UpdateOrderStatusRequest, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
     existing_order = db.get(Orders, orderID)
     if not existing_order:
         raise HTTPException(status_code=404, detail="Order not found")
+    authorize_customer(current_user, existing_order.customerID, allow_admin=True)
     existing_customer = db.get(Customer, existing_order.customerID)
     if not existing_customer:
         raise HTTPException(status_code=404, detail="User not found")
-    print('1233**************88*****8',current_user["email"],existing_customer.Email,current_user["role"],"*********8")
-    if(current_user["email"]!=existing_customer.Email and current_user["role"] not in ["admin"]):
-        raise HTTPException(status_code=403, detail="Access denied beacue *****")
 
     # Get cart for the given customerID
     order= db.exec(select(Orders).where(Orders.orderID == orderID)).first()
@@ -1866,13 +3136,14 @@ def update_order_status(orderID: int, status: UpdateOrderStatusRequest,backgroun
         )
         for order_prod, product in order_products:
             product.quantity=product.quantity+order_prod.quantity
+        change_versions.bump(db, "stock")
         db.commit
         email = EmailSchema(
             email=existing_customer.Email,
             subject="Order Cancelled",
             body=f"<h1>Youur order #{orderID}!</h1><p> has been  cancelled.</p>"
         )
-        background_tasks.add_task(send_email, email)
+        queue_email(db, email)
         
 
     elif(order.status=="return_requested" and status.status=="delivered"):
@@ -1889,7 +3160,7 @@ def update_order_status(orderID: int, status: UpdateOrderStatusRequest,backgroun
             subject="Return request Cancelled",
             body=f"<h1>Youur order #{orderID}!</h1><p> return request has been  cancelled.</p>"
         )
-        background_tasks.add_task(send_email, email)
+        queue_email(db, email)
 
 
     elif((order.status=="picked_up" or order.status=="returned") and status.status=="delivered"):
@@ -1915,7 +3186,7 @@ def update_order_status(orderID: int, status: UpdateOrderStatusRequest,backgroun
             subject="Return requested",
             body=f"<h1>Your order #{orderID}!</h1><p> has return requested.</p>"
         )
-        background_tasks.add_task(send_email, email)
+        queue_email(db, email)
     elif(status.status=="shipped"):
         # order.status = status.status
         email = EmailSchema(
@@ -1923,7 +3194,7 @@ def update_order_status(orderID: int, status: UpdateOrderStatusRequest,backgroun
             subject="Order shipped",
             body=f"<h1>Your order #{orderID}!</h1><p>  has been  shipped.</p>"
         )
-        background_tasks.add_task(send_email, email)
+        queue_email(db, email)
 
     elif(status.status=="delivered"):
         # order.status = status.status
@@ -1932,7 +3203,7 @@ def update_order_status(orderID: int, status: UpdateOrderStatusRequest,backgroun
             subject="Order delivered",
             body=f"<h1>Your order #{orderID}!</h1><p>  has been  delivered.</p>"
         )
-        background_tasks.add_task(send_email, email)
+        queue_email(db, email)
 
     order.status = status.status
     db.commit()
@@ -1944,42 +3215,178 @@ def update_order_status(orderID: int, status: UpdateOrderStatusRequest,backgroun
 
 
 
-@app.get("/admin-view-orders")
-def view_orders(current_user: dict = Depends(get_current_user),db: Session = Depends(get_db)):
+ADMIN_ORDER_PAGE_SIZE = 50
+MAX_ADMIN_ORDER_PAGE_SIZE = 200
+ORDER_COUNT_TTL = 30  # Seconds a filtered order count is reused
+# sort name -> (Orders column, descending); orderID breaks ties
+ORDER_SORTS = {
+    "newest": ("created_at", True),
+    "oldest": ("created_at", False),
+    "amount-desc": ("total_price", True),
+    "amount-asc": ("total_price", False),
+}
+
+class CountCache:
+    """Row counts per filter combination, reused for ttl seconds so paging never recounts"""
+
+    def __init__(self, ttl: float, size: int = 1000):
+        self.ttl = ttl
+        self.size = size
+        self._entries: "OrderedDict[tuple, Tuple[float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, count: Callable[[], int]) -> int:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+        value = count()
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        return value
+
+
+order_counts = CountCache(ORDER_COUNT_TTL)
+
+def parse_order_cursor(cursor: str, sort_field: str):
+    last_value, last_id = decode_cursor(cursor)
+    if type(last_id) is not int:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    try:
+        if sort_field == "created_at":
+            last_value = datetime.datetime.fromisoformat(last_value)
+        else:
+            last_value = Decimal(last_value)
+        return last_value, last_id
+    except (TypeError, ValueError, ArithmeticError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
+@app.get("/admin-view-orders")
+def view_orders(
+    response: Response,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(read_db()),
+    limit: int = Query(ADMIN_ORDER_PAGE_SIZE, ge=1, le=MAX_ADMIN_ORDER_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    sort: str = Query("newest", description="newest, oldest, amount-desc or amount-asc"),
+    order_status: Optional[str] = Query(None, alias="status"),
+    payment_status: Optional[str] = Query(None),
+    created_from: Optional[datetime.date] = Query(None),
+    created_to: Optional[datetime.date] = Query(None, description="Inclusive"),
+    email: Optional[str] = Query(None, min_length=1, description="Customer email prefix"),
+):
     if current_user["role"] not in ["admin"]:
         raise HTTPException(status_code=403, detail="Access denied")
-    # Fetch all orders along with customer email and address
-    orders_with_details = (
-        db.exec(
-            select(
-                Orders,
-                Customer.Email,
-                
-            )
-            .join(Customer, Orders.customerID == Customer.CustomerID)
-           
-            .distinct()  # Ensures unique orders are returned
-        ).all()
+    if sort not in ORDER_SORTS:
+        raise HTTPException(status_code=400, detail=f"Unknown sort, use one of: {', '.join(ORDER_SORTS)}")
+
+    filters = []
+    if order_status:
+        filters.append(Orders.status == order_status)
+    if payment_status:
+        filters.append(Orders.payment_status == payment_status)
+    if created_from:
+        filters.append(Orders.created_at >= created_from)
+    if created_to:
+        filters.append(Orders.created_at < created_to + datetime.timedelta(days=1))
+    if email:
+        # Prefix match stays on the Email index; customers first, then their orders
+        filters.append(Orders.customerID.in_(
+            select(Customer.CustomerID).where(Customer.Email.startswith(email, autoescape=True))
+        ))
+
+    # The body stays a plain list; paging and the total travel in headers
+    filter_key = (order_status, payment_status, created_from, created_to, email)
+    total = order_counts.get(filter_key, lambda: db.exec(select(func.count()).select_from(Orders).where(*filters)).one())
+    response.headers["X-Total-Count"] = str(total)
+
+    sort_field, descending = ORDER_SORTS[sort]
+    sort_column = getattr(Orders, sort_field)
+    query = (
+        select(Orders.orderID, Orders.customerID, Customer.Email, Orders.total_price, Orders.created_at, Orders.status)
+        .join(Customer, Orders.customerID == Customer.CustomerID)
+        .where(*filters)
     )
+    if cursor:
+        last_value, last_id = parse_order_cursor(cursor, sort_field)
+        query = query.where(keyset_after(sort_column, Orders.orderID, descending, last_value, last_id))
 
-    # Format response
-    response = []
-    for order, email in orders_with_details:
-        response.append({
-            "orderID": order.orderID,
-            "customerID": order.customerID,
-            "customerEmail": email,
-            "amount": order.total_price,
-            "created_At": order.created_at,
-            "status": order.status,
-            
-            
-        })
-    
-    return response
-    
+    order = [desc(sort_column), desc(Orders.orderID)] if descending else [sort_column, Orders.orderID]
+    rows = db.exec(query.order_by(*order).limit(limit + 1)).all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_row = rows[-1]._mapping
+        response.headers["X-Next-Cursor"] = encode_cursor([last_row[sort_field], last_row["orderID"]])
 
+    return [
+        {
+            "orderID": order_id,
+            "customerID": customer_id,
+            "customerEmail": customer_email,
+            "amount": total_price,
+            "created_At": created_at,
+            "status": state,
+        }
+        for order_id, customer_id, customer_email, total_price, created_at, state in rows
+    ]
+
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))  # Rows fetched and written per chunk
+
+def export_statement(dataset: str, created_from: Optional[datetime.date], created_to: Optional[datetime.date]):
+    """Columns and date filter of each export, in primary key order"""
+    if dataset == "orders":
+        statement = (
+            select(Orders.orderID, Orders.customerID, Customer.Email.label("customerEmail"), Orders.total_price,
+                   Orders.status, Orders.payment_status, Orders.delivery_date, Orders.created_at, Orders.updated_at)
+            .join(Customer, Orders.customerID == Customer.CustomerID)
+            .order_by(Orders.orderID)
+        )
+        created_column = Orders.created_at
+    elif dataset == "customers":
+        statement = select(
+            Customer.CustomerID, Customer.FirstName, Customer.LastName, Customer.Email, Customer.PhoneNumber, Customer.CreatedAt
+        ).order_by(Customer.CustomerID)
+        created_column = Customer.CreatedAt
+    else:
+        if created_from or created_to:
+            raise HTTPException(status_code=400, detail="Products have no creation date to filter on")
+        return select(
+            Products.productID, Products.SKU, Products.name, Products.price, Products.quantity, Products.description, Products.image_path
+        ).order_by(Products.productID)
+
+    if created_from:
+        statement = statement.where(created_column >= created_from)
+    if created_to:
+        statement = statement.where(created_column < created_to + datetime.timedelta(days=1))
+    return statement
+
+# Full dumps for reconciliation, streamed from a server-side cursor so memory stays flat
+@app.get("/export/{dataset}")
+def export_dataset(
+    dataset: Literal["orders", "products", "customers"],
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+    format: Literal["csv", "ndjson"] = Query("csv"),
+    created_from: Optional[datetime.date] = Query(None),
+    created_to: Optional[datetime.date] = Query(None, description="Inclusive"),
+):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    statement = export_statement(dataset, created_from, created_to)
+    use_replica = replica_router.use_replica(request, {})
+    request.state.db_route = "replica" if use_replica else "primary"
+    filename = f"{dataset}-{datetime.date.today():%Y%m%d}.{format}"
+    return StreamingResponse(
+        export_rows(replica_engine if use_replica else engine, statement, format, EXPORT_BATCH_SIZE),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @app.get("/admin-view-order/{orderID}")
@@ -2105,7 +3512,6 @@ class UpdateReturnRequest(SQLModel):
 @app.post("/update-returns")
 def update_return_status(
     request: UpdateReturnRequest,
-    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -2138,7 +3544,7 @@ def update_return_status(
             subject="Return request Approved",
             body=f"<h1>Your return request approved !</h1><p> your return request for order #{return_request.orderID} has been approved</p>"
         )
-        background_tasks.add_task(send_email, email)
+        queue_email(db, email)
     elif request.status == "rejected":
         return_request.status = "rejected"
         return_request.rejection_reason=request.rejection_reason
@@ -2149,7 +3555,7 @@ def update_return_status(
             subject="Return request rejected",
             body=f"<h1>Your return request rejected !</h1><p> your return request for order #{return_request.orderID} has been rejected</p>"
         )
-        background_tasks.add_task(send_email, email)
+        queue_email(db, email)
     elif request.status == "picked_up":
         return_request.status = "picked_up"
         order.status = "picked_up" 
@@ -2158,7 +3564,7 @@ def update_return_status(
             subject="Return pciked up",
             body=f"<h1>Your return picked up !</h1><p> your return request for order #{return_request.orderID} has been picked up</p>"
         )
-        background_tasks.add_task(send_email, email)
+        queue_email(db, email)
     elif request.status == "refunded":
         return_request.status = "refunded"
         order.status = "returned"
@@ -2185,7 +3591,7 @@ def update_return_status(
             body=f"<h1>Your return is succesfull!</h1><p> your return request for order #{return_request.orderID} has is successful and refund initiated</p><h3>Your refund details:</h3><p>Refund amount : {refund.refund_amount}</p><p>Processed on:{refund.processed_at}</p>"
 
         )
-        background_tasks.add_task(send_email, email)
+        queue_email(db, email)
 
     # Commit changes
     db.add(return_request)
@@ -2206,9 +3612,7 @@ def view_refund(orderID: int, current_user: dict = Depends(get_current_user), db
         raise HTTPException(status_code=404, detail="Order not found")
 
     # Ensure the user is either admin or the owner of the order
-    existing_customer = db.get(Customer, order.customerID)
-    if not existing_customer or current_user["email"] != existing_customer.Email:
-        raise HTTPException(status_code=403, detail="Access denied")
+    authorize_customer(current_user, order.customerID)
 
     # Fetch return request related to the order
     if(order.status=="returned"):
@@ -2268,8 +3672,8 @@ def verify_reset_token(token: str):
     
 
 @app.post("/forgot-password")
-async def forgot_password(request: PasswordResetRequest,background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
-    user = db.query(Users).filter(Users.email == request.email).first()
+async def forgot_password(request: PasswordResetRequest,background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_async_db)):
+    user = (await db.exec(select(Users).where(Users.email == request.email))).first()
     if not user:
         raise HTTPException(status_code=404, detail="Email not found")
     
@@ -2283,18 +3687,18 @@ class ResetPassword(BaseModel):
     new_password: str
 
 @app.post("/reset-password")
-async def reset_password(request: ResetPassword, db: Session = Depends(get_db)):
+async def reset_password(request: ResetPassword, db: AsyncSession = Depends(get_async_db)):
     email = verify_reset_token(request.token)
     if not email:
         raise HTTPException(status_code=400, detail="Invalid or expired token")
 
-    user = db.query(Users).filter(Users.email == email).first()
+    user = (await db.exec(select(Users).where(Users.email == email))).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    hashed_password = pwd_context.hash(request.new_password)
+    hashed_password = await password_hasher.hash(request.new_password)
     user.password = hashed_password
-    db.commit()
+    await db.commit()
 
     return {"message": "Password reset successfully."}
 
@@ -0,0 +1,430 @@
+import hashlib
+import json
+import sys
+from typing import Callable, List, Sequence, Tuple
+
+from sqlalchemy import (
+    BigInteger, Column, DECIMAL, Date, Enum, Float, ForeignKey, Index, Integer, JSON, MetaData, String, TIMESTAMP, Table, Text,
+    bindparam, column, delete, func, inspect, insert, select, table, text, update,
+)
+from sqlalchemy.engine import Connection, Engine
+
+# Applied migrations, one row per version
+migrations_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    migrations_metadata,
+    Column("version", Integer, primary_key=True, autoincrement=False),
+    Column("name", String(255), nullable=False),
+    Column("applied_at", TIMESTAMP, server_default=text("CURRENT_TIMESTAMP")),
+)
+
+SCHEMA_LOCK_TIMEOUT = 60  # Seconds another worker may spend migrating before we give up
+
+Migration = Callable[[Connection], None]
+MIGRATIONS: List[Tuple[int, str, Migration]] = []
+
+
+def migration(version: int, name: str):
+    def register(fn: Migration) -> Migration:
+        MIGRATIONS.append((version, name, fn))
+        return fn
+    return register
+
+
+# MySQL commits DDL implicitly, so a migration cannot be rolled back halfway. Each one
+# checks the current schema first and is safe to run again after a partial failure.
+# Migrations describe tables as they were at that version and must not import the app's models.
+
+def _created_at() -> Column:
+    return Column("created_at", TIMESTAMP, server_default=text("CURRENT_TIMESTAMP"))
+
+
+def _updated_at() -> Column:
+    return Column("updated_at", TIMESTAMP, server_default=text("CURRENT_TIMESTAMP"), onupdate=text("CURRENT_TIMESTAMP"))
+
+
+def _address_columns() -> List[Column]:
+    return [
+        Column("name", String(255), nullable=False),
+        Column("countryID", Integer, nullable=False),
+        Column("state", String(255), nullable=False),
+        Column("district", String(255), nullable=False),
+        Column("city", String(255), nullable=False),
+        Column("street", String(255), nullable=False),
+    ]
+
+
+def _v1_tables() -> MetaData:
+    """The models' tables as they were when migrations were introduced"""
+    v1 = MetaData()
+    Table("users", v1,
+          Column("userID", Integer, primary_key=True),
+          Column("name", String(255), nullable=False),
+          Column("email", String(255), nullable=False),
+          Column("password", String(255), nullable=False),
+          Column("role", String(255), nullable=False),
+          Column("profile_image", String(255), nullable=False),
+          _created_at())
+    Table("customers", v1,
+          Column("CustomerID", Integer, primary_key=True),
+          Column("FirstName", String(255), nullable=False),
+          Column("LastName", String(255), nullable=False),
+          Column("Email", String(255), nullable=False),
+          Column("PhoneNumber", String(255), nullable=False),
+          Column("Password", String(255), nullable=False),
+          Column("CreatedAt", TIMESTAMP, server_default=text("CURRENT_TIMESTAMP")))
+    Table("address", v1,
+          Column("addressID", Integer, primary_key=True),
+          Column("customerID", Integer, nullable=False),
+          *_address_columns(),
+          Column("building_name", String(255), nullable=False),
+          Column("pincode", String(255), nullable=False),
+          Column("phone_number", String(255), nullable=False))
+    Table("category", v1,
+          Column("categoryID", Integer, primary_key=True),
+          Column("name", String(255), nullable=False),
+          Column("parentID", Integer, ForeignKey("category.categoryID")),
+          Column("description", String(255)),
+          Column("path", String(1000)))
+    Table("category_closure", v1,
+          Column("ancestorID", Integer, ForeignKey("category.categoryID"), primary_key=True),
+          Column("descendantID", Integer, ForeignKey("category.categoryID"), primary_key=True),
+          Column("depth", Integer, nullable=False),
+          Index("ix_category_closure_descendantID", "descendantID"))
+    Table("products", v1,
+          Column("productID", Integer, primary_key=True),
+          Column("name", String(255), nullable=False),
+          Column("description", String(255), nullable=False),
+          Column("SKU", String(255), nullable=False),
+          Column("price", Integer, nullable=False),
+          Column("quantity", Integer, nullable=False),
+          Column("image_path", String(500)))
+    Table("cat_prod", v1,
+          Column("id", Integer, primary_key=True),
+          Column("productID", Integer, nullable=False),
+          Column("categoryID", Integer, nullable=False))
+    Table("product_options", v1,
+          Column("id", Integer, primary_key=True),
+          Column("title", String(255), nullable=False),
+          Column("type", Enum("dropdown", "radio", name="option_type_enum")),
+          Column("status", Enum("active", "inactive", name="option_status_enum")),
+          Column("productID", Integer, nullable=False),
+          Column("is_required", Enum("yes", "no", name="option_required_enum")),
+          _created_at(), _updated_at())
+    Table("product_option_values", v1,
+          Column("id", Integer, primary_key=True),
+          Column("product_option_id", Integer, nullable=False),
+          Column("title", String(255), nullable=False),
+          Column("price", DECIMAL(10, 2), nullable=False),
+          Column("sku", String(255), nullable=False),
+          Column("quantity", Integer, nullable=False),
+          _created_at(), _updated_at())
+    Table("cart", v1,
+          Column("cartID", Integer, primary_key=True),
+          Column("customerID", Integer, nullable=False),
+          Column("status", String(255), nullable=False))
+    Table("cart_prod", v1,
+          Column("id", Integer, primary_key=True),
+          Column("cartID", Integer, nullable=False),
+          Column("productID", Integer, nullable=False),
+          Column("price", Float, nullable=False),
+          Column("quantity", Integer, nullable=False),
+          # The model also declared UNIQUE (cartID, productID, selected_options), which only
+          # ever existed outside MySQL: MySQL cannot index a JSON column. Migration 2 replaces it.
+          Column("selected_options", JSON))
+    Table("shipping_rates", v1,
+          Column("id", Integer, primary_key=True),
+          Column("country_name", String(255), nullable=False),
+          Column("shipping_cost", DECIMAL(10, 2)))
+    Table("orders", v1,
+          Column("orderID", Integer, primary_key=True),
+          Column("customerID", Integer, ForeignKey("customers.CustomerID"), nullable=False),
+          Column("total_price", DECIMAL(10, 2)),
+          _created_at(), _updated_at(),
+          Column("delivery_date", Date),
+          Column("status", Enum("pending", "confirmed", "shipped", "out_for_delivery", "delivered", "cancelled", "returned",
+                                "return_requested", "return_approved", "picked_up", name="order_status_enum")),
+          Column("payment_status", Enum("pending", "paid", "failed", "refunded", name="payment_status_enum")),
+          Column("invoice_path", String(255)))
+    Table("order_addresses", v1,
+          Column("orderAddressID", Integer, primary_key=True),
+          Column("orderID", Integer, nullable=False),
+          Column("customerID", Integer, nullable=False),
+          *_address_columns(),
+          Column("building_name", String(255)),
+          Column("pincode", String(255), nullable=False),
+          Column("phone_number", String(255), nullable=False),
+          _created_at())
+    Table("order_prod", v1,
+          Column("id", Integer, primary_key=True),
+          Column("orderID", Integer, nullable=False),
+          Column("productID", Integer, nullable=False),
+          Column("quantity", Integer, nullable=False),
+          Column("price", Float, nullable=False),
+          Column("selected_options", JSON))
+    Table("invoice_jobs", v1,
+          Column("id", Integer, primary_key=True),
+          Column("orderID", Integer, ForeignKey("orders.orderID"), nullable=False, index=True),
+          Column("status", Enum("pending", "rendering", "done", "failed", name="invoice_job_status_enum")),
+          Column("attempts", Integer, nullable=False),
+          Column("error", String(500)),
+          _created_at(), _updated_at())
+    Table("email_outbox", v1,
+          Column("id", Integer, primary_key=True),
+          Column("recipient", String(255), nullable=False),
+          Column("subject", String(255), nullable=False),
+          Column("body", Text, nullable=False),
+          Column("attachment_path", String(500)),
+          Column("status", Enum("pending", "sending", "sent", "dead", name="email_outbox_status_enum")),
+          Column("attempts", Integer, nullable=False),
+          Column("next_attempt_at", TIMESTAMP, nullable=False),
+          Column("last_error", String(500)),
+          _created_at(),
+          Column("sent_at", TIMESTAMP),
+          Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"))
+    Table("change_versions", v1,
+          Column("name", String(64), primary_key=True),
+          Column("version", Integer, nullable=False))
+    Table("payments", v1,
+          Column("id", Integer, primary_key=True),
+          Column("orderID", Integer, ForeignKey("orders.orderID"), nullable=False),
+          Column("customerID", Integer, ForeignKey("customers.CustomerID"), nullable=False),
+          Column("payment_method", String(20), nullable=False),
+          Column("transactionID", String(255), unique=True),
+          Column("amount", Float, nullable=False),
+          Column("status", String(20), nullable=False),
+          _created_at())
+    Table("order_cancellations", v1,
+          Column("id", Integer, primary_key=True),
+          Column("orderID", Integer, ForeignKey("orders.orderID"), nullable=False),
+          Column("customerID", Integer, ForeignKey("customers.CustomerID"), nullable=False),
+          Column("reason", String(255)),
+          Column("status", Enum("requested", "approved", "rejected", name="cancellation_status_enum")),
+          Column("cancelled_at", TIMESTAMP, server_default=text("CURRENT_TIMESTAMP")))
+    Table("returns", v1,
+          Column("returnID", Integer, primary_key=True),
+          Column("orderID", Integer, ForeignKey("orders.orderID"), nullable=False),
+          Column("customerID", Integer, ForeignKey("customers.CustomerID"), nullable=False),
+          Column("reason", String(255)),
+          Column("status", String(20), nullable=False),
+          Column("rejection_reason", String(255)),
+          Column("requested_at", TIMESTAMP, server_default=text("CURRENT_TIMESTAMP")),
+          Column("processed_at", TIMESTAMP),
+          Column("pickup_addressID", Integer, ForeignKey("address.addressID"), nullable=False))
+    Table("refunds", v1,
+          Column("id", Integer, primary_key=True),
+          Column("returnID", Integer, ForeignKey("returns.returnID")),
+          Column("cancellationID", Integer, ForeignKey("order_cancellations.id")),
+          Column("customerID", Integer, ForeignKey("customers.CustomerID"), nullable=False),
+          Column("paymentID", Integer, ForeignKey("payments.id"), nullable=False),
+          Column("refund_amount", DECIMAL(10, 2), nullable=False),
+          Column("status", Enum("pending", "processed", "failed", name="refund_status_enum")),
+          Column("processed_at", TIMESTAMP))
+    return v1
+
+
+@migration(1, "create_tables")
+def create_tables(conn: Connection):
+    # Creates only the tables that are missing, so it also brings databases that predate
+    # the migrations up to this version. Later changes belong in later migrations.
+    _v1_tables().create_all(conn)
+
+
+def _options_digest(raw) -> str:
+    # Frozen copy of main.options_hash as of this migration
+    options = json.loads(raw) if raw else None
+    if isinstance(options, str):  # add-to-cart stores the options serialized a second time
+        options = json.loads(options) if options else None
+    canonical = json.dumps(options or {}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+@migration(2, "options_hash")
+def add_options_hash(conn: Connection):
+    # Key cart and order lines on a digest of their options; merges cart lines that collide
+    for table_name in ("cart_prod", "order_prod"):
+        if any(col["name"] == "options_hash" for col in inspect(conn).get_columns(table_name)):
+            continue
+        lines = table(table_name, column("id"), column("cartID"), column("productID"), column("quantity"),
+                      column("selected_options"), column("options_hash"))
+        conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN options_hash VARCHAR(64) NOT NULL DEFAULT ''"))
+        rows = conn.execute(select(lines.c.id, lines.c.selected_options)).all()
+        if rows:
+            conn.execute(
+                update(lines).where(lines.c.id == bindparam("line_id")).values(options_hash=bindparam("digest")),
+                [{"line_id": row.id, "digest": _options_digest(row.selected_options)} for row in rows],
+            )
+
+        if table_name == "order_prod":
+            conn.execute(text("CREATE INDEX ix_order_prod_order_product_options ON order_prod (orderID, productID, options_hash)"))
+            continue
+
+        kept = {}
+        for line in conn.execute(select(lines.c.id, lines.c.cartID, lines.c.productID, lines.c.options_hash, lines.c.quantity).order_by(lines.c.id)).all():
+            key = (line.cartID, line.productID, line.options_hash)
+            if key in kept:
+                kept_id, quantity = kept[key]
+                kept[key] = (kept_id, quantity + line.quantity)
+                conn.execute(delete(lines).where(lines.c.id == line.id))
+                conn.execute(update(lines).where(lines.c.id == kept_id).values(quantity=quantity + line.quantity))
+            else:
+                kept[key] = (line.id, line.quantity)
+
+        if any(index["name"] == "uq_cart_product_options" for index in inspect(conn).get_indexes(table_name)):
+            conn.execute(text("ALTER TABLE cart_prod DROP INDEX uq_cart_product_options"))
+        conn.execute(text("ALTER TABLE cart_prod ADD UNIQUE KEY uq_cart_product_options (cartID, productID, options_hash)"))
+
+
+# (table, index name, columns) for the columns the storefront and checkout filter on
+HOT_PATH_INDEXES = [
+    ("cart", "ix_cart_customerID_status", ("customerID", "status")),
+    ("cart_prod", "ix_cart_prod_cartID", ("cartID",)),
+    ("order_prod", "ix_order_prod_orderID", ("orderID",)),
+    ("orders", "ix_orders_customerID", ("customerID",)),
+    ("order_addresses", "ix_order_addresses_orderID", ("orderID",)),
+    ("returns", "ix_returns_orderID_requested_at", ("orderID", "requested_at")),
+    ("payments", "ix_payments_orderID", ("orderID",)),
+    ("product_options", "ix_product_options_productID", ("productID",)),
+    ("product_option_values", "ix_product_option_values_product_option_id", ("product_option_id",)),
+    ("category", "ix_category_parentID", ("parentID",)),
+    ("customers", "ix_customers_Email", ("Email",)),
+    ("users", "ix_users_email", ("email",)),
+]
+
+
+def covering_index_exists(conn: Connection, table_name: str, columns: Sequence[str]) -> bool:
+    """True if an existing index (or the primary key) starts with these columns"""
+    inspector = inspect(conn)
+    existing = [index["column_names"] for index in inspector.get_indexes(table_name)]
+    existing += [constraint["column_names"] for constraint in inspector.get_unique_constraints(table_name)]
+    existing.append(inspector.get_pk_constraint(table_name)["constrained_columns"])
+    return any(tuple(names[:len(columns)]) == tuple(columns) for names in existing)
+
+
+def create_missing_indexes(conn: Connection, indexes: Sequence[Tuple[str, str, Sequence[str]]]):
+    # Skips columns already led by another index, e.g. cart_prod.cartID by uq_cart_product_options
+    # or the index MySQL creates for a foreign key
+    tables = set(inspect(conn).get_table_names())
+    quote = conn.dialect.identifier_preparer.quote
+    for table_name, index_name, columns in indexes:
+        if table_name not in tables or covering_index_exists(conn, table_name, columns):
+            continue
+        conn.execute(text(f"CREATE INDEX {quote(index_name)} ON {quote(table_name)} ({', '.join(quote(c) for c in columns)})"))
+
+
+@migration(3, "hot_path_indexes")
+def add_hot_path_indexes(conn: Connection):
+    create_missing_indexes(conn, HOT_PATH_INDEXES)
+
+
+@migration(4, "replica_heartbeat")
+def add_replica_heartbeat(conn: Connection):
+    # Single row the primary keeps bumping; its age on a replica is that replica's lag
+    heartbeat = Table(
+        "replica_heartbeat",
+        MetaData(),
+        Column("id", Integer, primary_key=True, autoincrement=False),
+        Column("beat_ms", BigInteger, nullable=False, server_default="0"),
+    )
+    heartbeat.create(conn, checkfirst=True)
+    if conn.execute(select(heartbeat.c.id).where(heartbeat.c.id == 1)).first() is None:
+        conn.execute(insert(heartbeat).values(id=1, beat_ms=0))
+
+
+@migration(5, "admin_order_indexes")
+def add_admin_order_indexes(conn: Connection):
+    # Filters and sort orders of the paginated admin order list
+    create_missing_indexes(conn, [
+        ("orders", "ix_orders_created_at", ("created_at",)),
+        ("orders", "ix_orders_status_created_at", ("status", "created_at")),
+        ("orders", "ix_orders_payment_status_created_at", ("payment_status", "created_at")),
+        ("orders", "ix_orders_total_price", ("total_price",)),
+    ])
+
+
+@migration(6, "unique_product_sku")
+def add_unique_product_sku(conn: Connection):
+    # Product imports upsert on SKU, so it has to be unique. Duplicates are left for a person
+    # to resolve: merging products would rewrite carts and order history.
+    inspector = inspect(conn)
+    existing = [index["name"] for index in inspector.get_indexes("products")] + [constraint["name"] for constraint in inspector.get_unique_constraints("products")]
+    if "uq_products_SKU" in existing:
+        return
+    products = table("products", column("SKU"))
+    duplicates = conn.execute(
+        select(products.c.SKU).group_by(products.c.SKU).having(func.count() > 1).limit(20)
+    ).scalars().all()
+    if duplicates:
+        raise RuntimeError(f"Products share these SKUs, make them unique and migrate again: {', '.join(map(str, duplicates))}")
+    conn.execute(text("ALTER TABLE products ADD UNIQUE KEY uq_products_SKU (SKU)"))
+
+
+@migration(7, "nullable_invoice_path")
+def make_invoice_path_nullable(conn: Connection):
+    # Orders are created before their invoice is rendered, so the path starts out NULL
+    invoice_path = next(col for col in inspect(conn).get_columns("orders") if col["name"] == "invoice_path")
+    if not invoice_path["nullable"]:
+        conn.execute(text("ALTER TABLE orders MODIFY invoice_path VARCHAR(255) NULL"))
+
+
+@migration(8, "category_link_indexes")
+def add_category_link_indexes(conn: Connection):
+    # Category listings look products up by category, product edits and deletes by product
+    create_missing_indexes(conn, [
+        ("cat_prod", "ix_cat_prod_categoryID_productID", ("categoryID", "productID")),
+        ("cat_prod", "ix_cat_prod_productID", ("productID",)),
+    ])
+
+
+@migration(9, "non_unique_product_description")
+def drop_unique_product_description(conn: Connection):
+    # Some databases were created with description UNIQUE. Imports upsert on SKU, and a
+    # second key would make a row with a shared description update that other product.
+    inspector = inspect(conn)
+    keys = inspector.get_indexes("products") + inspector.get_unique_constraints("products")
+    names = {key["name"] for key in keys if key.get("unique", True) and key["column_names"] == ["description"]}
+    for name in sorted(names):
+        conn.execute(text(f"ALTER TABLE products DROP INDEX `{name}`"))
+
+
+def run_migrations(engine: Engine) -> List[int]:
+    """Apply pending migrations in version order and return the versions applied"""
+    applied_now = []
+    with engine.connect() as conn:
+        # Workers starting together take turns; the first applies, the rest find nothing to do
+        locked = conn.dialect.name == "mysql"
+        if locked and not conn.execute(text("SELECT GET_LOCK('schema_migrations', :timeout)"), {"timeout": SCHEMA_LOCK_TIMEOUT}).scalar():
+            raise RuntimeError("Timed out waiting for another process to finish migrating")
+        try:
+            migrations_metadata.create_all(conn)
+            conn.commit()
+            applied = set(conn.execute(select(schema_migrations.c.version)).scalars())
+            for version, name, migrate in sorted(MIGRATIONS, key=lambda m: m[0]):
+                if version in applied:
+                    continue
+                migrate(conn)
+                conn.execute(insert(schema_migrations).values(version=version, name=name))
+                conn.commit()
+                applied_now.append(version)
+        finally:
+            if locked:
+                conn.execute(text("SELECT RELEASE_LOCK('schema_migrations')"))
+    return applied_now
+
+
+# python migrations.py           apply pending migrations
+# python migrations.py --status  list versions and whether each is applied
+if __name__ == "__main__":
+    from main import engine
+
+    if "--status" in sys.argv[1:]:
+        with engine.connect() as conn:
+            migrations_metadata.create_all(conn)
+            conn.commit()
+            applied = set(conn.execute(select(schema_migrations.c.version)).scalars())
+        for version, name, _ in sorted(MIGRATIONS, key=lambda m: m[0]):
+            print(f"{version:>4}  {'applied' if version in applied else 'pending':<8} {name}")
+    else:
+        versions = run_migrations(engine)
+        print(f"Applied {len(versions)} migration(s): {versions}" if versions else "Schema is up to date")
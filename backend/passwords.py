@@ -0,0 +1,117 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, Optional
+
+from passlib.context import CryptContext
+
+# Password Hashing
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+# Function to hash password
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+# Function to verify password
+def verify_password(plain_password, hashed_password):
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+class HasherOverloaded(Exception):
+    """Raised instead of queueing when too many hashes are already waiting"""
+
+
+class PasswordHasher:
+    """Runs bcrypt in a process pool so it neither holds the GIL nor blocks the event loop.
+
+    At most max_pending calls may be running or queued; beyond that calls fail fast
+    with HasherOverloaded, so a login flood cannot starve catalog traffic of CPU and
+    threadpool workers.
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 32):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {
+            name: {"calls": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+            for name in ("hash", "verify")
+        }
+        self._rejected = 0
+
+    def _submit(self, fn, *args) -> Future:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise HasherOverloaded("Too many password operations in progress")
+            self._pending += 1
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            pool = self._pool
+
+        started = time.perf_counter()
+        try:
+            future = pool.submit(fn, *args)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(lambda _: self._record(fn, time.perf_counter() - started))
+        return future
+
+    def _record(self, fn, seconds: float):
+        name = "hash" if fn is hash_password else "verify"
+        with self._lock:
+            self._pending -= 1
+            stats = self._stats[name]
+            stats["calls"] += 1
+            stats["total_seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+
+    # For async handlers: awaits without blocking the event loop
+    async def hash(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(hash_password, password))
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await asyncio.wrap_future(self._submit(verify_password, plain_password, hashed_password))
+
+    # For sync handlers, which already run in the threadpool
+    def hash_sync(self, password: str) -> str:
+        return self._submit(hash_password, password).result()
+
+    def verify_sync(self, plain_password: str, hashed_password: str) -> bool:
+        return self._submit(verify_password, plain_password, hashed_password).result()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "pending": self._pending,
+                "max_pending": self.max_pending,
+                "rejected": self._rejected,
+                **{
+                    name: {
+                        "calls": int(stats["calls"]),
+                        "avg_seconds": stats["total_seconds"] / stats["calls"] if stats["calls"] else 0.0,
+                        "max_seconds": stats["max_seconds"],
+                    }
+                    for name, stats in self._stats.items()
+                },
+            }
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool:
+            pool.shutdown(wait=True)
+
+
+password_hasher = PasswordHasher(
+    workers=int(os.getenv("PASSWORD_HASH_WORKERS", "2")),
+    max_pending=int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32")),
+)
@@ -0,0 +1,173 @@
+import codecs
+import csv
+import json
+import logging
+import sys
+from decimal import Decimal
+from typing import IO, Iterable, Iterator, List, Literal, Optional, Tuple
+
+from pydantic import BaseModel, Field, ValidationError, field_validator
+
+import_log = logging.getLogger("product_import")
+
+IMPORT_FORMATS = ("csv", "ndjson")
+MAX_REPORTED_ERRORS = 1000  # Failed rows past this are counted but not listed
+CATEGORY_SEPARATOR = "|"  # Between category paths in a CSV cell; segments of one path use "/"
+
+
+class ImportValue(BaseModel):
+    title: str = Field(min_length=1)
+    price: Decimal = Field(default=Decimal("0"), ge=0, max_digits=10, decimal_places=2)
+    sku: str = Field(min_length=1)
+    quantity: int = Field(ge=0)
+
+
+class ImportOption(BaseModel):
+    title: str = Field(min_length=1)
+    type: Literal["dropdown", "radio"] = "dropdown"
+    is_required: Literal["yes", "no"] = "yes"
+    status: Literal["active", "inactive"] = "active"
+    values: List[ImportValue] = []
+
+
+class ImportRow(BaseModel):
+    """One product, matched to an existing one by SKU. Left-out fields take their defaults,
+    except options, categories and image_path, which keep the product's current ones."""
+
+    SKU: str = Field(min_length=1, max_length=255)
+    name: str = Field(min_length=1)
+    description: str = ""
+    price: int = Field(ge=0)
+    quantity: int = Field(default=0, ge=0)
+    image_path: Optional[str] = Field(default=None, max_length=500)
+    options: Optional[List[ImportOption]] = None
+    categories: Optional[List[str]] = None  # Paths from the root, e.g. "Electronics/Phones"
+
+    @field_validator("SKU", "name")
+    @classmethod
+    def strip(cls, value: str) -> str:
+        return value.strip()
+
+    @field_validator("options")
+    @classmethod
+    def unique_option_titles(cls, options):
+        titles = [option.title for option in options or []]
+        if len(titles) != len(set(titles)):
+            raise ValueError("option titles must be unique within a product")
+        return options
+
+
+def category_path_key(path: str) -> str:
+    return "/".join(segment.strip() for segment in path.split("/") if segment.strip())
+
+
+def _csv_row(record: dict) -> dict:
+    # Empty cells are missing values; options is a JSON cell, categories a |-separated one
+    row = {key: value for key, value in record.items() if key and value not in ("", None)}
+    if "options" in row:
+        row["options"] = json.loads(row["options"])
+    if "categories" in row:
+        row["categories"] = [path for path in row["categories"].split(CATEGORY_SEPARATOR) if path.strip()]
+    return row
+
+
+def read_rows(binary: IO[bytes], fmt: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Yield (row number, raw row, parse error) reading the file line by line.
+
+    Row numbers are 1-based data rows; the CSV header is not counted.
+    """
+    text = codecs.getreader("utf-8-sig")(binary, errors="replace")
+    if fmt == "csv":
+        for number, record in enumerate(csv.DictReader(text), start=1):
+            try:
+                yield number, _csv_row(record), None
+            except ValueError as e:
+                yield number, None, f"Invalid options JSON: {e}"
+        return
+
+    number = 0
+    for line in text:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield number, None, "Each line must be a JSON object"
+            continue
+        yield number, row, None
+
+
+def validate_row(raw: dict) -> ImportRow:
+    try:
+        return ImportRow.model_validate(raw)
+    except ValidationError as e:
+        raise ValueError("; ".join(
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+        ))
+
+
+def batched(items: Iterable, size: int) -> Iterator[list]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class ImportConflict(Exception):
+    """The upsert matched other products through a unique key that is not the SKU"""
+
+    def __init__(self, rows: List[Tuple[int, ImportRow]], retry: List[Tuple[int, ImportRow]]):
+        super().__init__(f"{len(rows)} row(s) matched another product")
+        self.rows = rows  # Rows to report
+        self.retry = retry  # The rest of the batch, to write again without them
+
+
+class ImportReport:
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.failed = 0
+        self.batches = 0
+        self.errors: List[dict] = []
+
+    def fail(self, row: int, error: str, sku: Optional[str] = None):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "SKU": sku, "error": error})
+
+    def progress(self) -> dict:
+        return {"rows": self.rows, "created": self.created, "updated": self.updated, "failed": self.failed, "batches": self.batches}
+
+    def as_dict(self) -> dict:
+        return {**self.progress(), "errors": self.errors, "errors_truncated": self.failed > len(self.errors)}
+
+
+# python product_import.py catalog.csv [--format ndjson] [--batch-size 500]
+if __name__ == "__main__":
+    import argparse
+
+    from sqlmodel import Session
+
+    from main import IMPORT_BATCH_SIZE, engine, import_products
+
+    parser = argparse.ArgumentParser(description="Create or update products by SKU from a CSV or NDJSON file")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="Defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    with open(args.path, "rb") as upload, Session(engine) as db:
+        report = import_products(db, upload, fmt, args.batch_size, on_batch=lambda r: print(json.dumps(r.progress()), flush=True))
+    for error in report.errors:
+        print(f"row {error['row']} ({error['SKU'] or '-'}): {error['error']}", file=sys.stderr)
+    sys.exit(1 if report.failed else 0)
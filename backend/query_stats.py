@@ -0,0 +1,138 @@
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+slow_query_log = logging.getLogger("sql.slow")
+n_plus_one_log = logging.getLogger("sql.n_plus_one")
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_IN_LIST_RE = re.compile(r"\bIN \((?:[^()]*)\)", re.IGNORECASE)
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%s|\?|%\(\w+\)s|:\w+")
+
+
+def fingerprint(statement: str) -> str:
+    """Statement text with literals and placeholders collapsed, so repeats of one query
+    with different values (and IN lists of any length) share a fingerprint"""
+    statement = _WHITESPACE_RE.sub(" ", statement).strip()
+    statement = _IN_LIST_RE.sub("IN (?)", statement)
+    return _LITERAL_RE.sub("?", statement)
+
+
+class QueryStats:
+    """Queries issued while handling one request (or one track_queries block)"""
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.fingerprints: Counter = Counter()
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.fingerprints[fingerprint(statement)] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Fingerprints issued at least threshold times, most repeated first: N+1 suspects"""
+        return [(fp, n) for fp, n in self.fingerprints.most_common() if n >= threshold]
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries(label: str = "") -> Iterator[QueryStats]:
+    # Threadpool workers run sync handlers in a copy of the request context, so they
+    # record into the same QueryStats object
+    stats = QueryStats(label)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+# Process-wide collectors, for test clients that run the app on another thread. They only
+# see queries issued while a request (or track_queries block) is being handled, so the
+# app's background loops polling the database do not count against a budget.
+_global: List[QueryStats] = []
+_global_lock = threading.Lock()
+
+
+@contextmanager
+def assert_max_queries(limit: int, label: str = "") -> Iterator[QueryStats]:
+    """Fail with the repeated statements if the block issues more than limit queries.
+
+        with assert_max_queries(6):
+            client.get("/cart", params={"customerID": 1}, headers=auth)
+
+    Counts the queries of every request handled in the process meanwhile, so run it on its own.
+    """
+    stats = QueryStats(label)
+    with _global_lock:
+        _global.append(stats)
+    try:
+        yield stats
+    finally:
+        with _global_lock:
+            _global.remove(stats)
+    if stats.count > limit:
+        repeats = "\n".join(f"  {n}x {fp}" for fp, n in stats.repeated(2)) or "  (no repeated statements)"
+        raise AssertionError(f"{label or 'Block'} issued {stats.count} queries, budget is {limit}. Repeated:\n{repeats}")
+
+
+def instrument_engine(engine: Engine, slow_query_ms: float):
+    """Time every statement on engine, add it to the current QueryStats and log slow ones"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def stop_timer(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info["query_started"].pop()
+        stats = _current.get()
+        if stats is not None:
+            stats.record(statement, seconds)
+        if _global and stats is not None:
+            with _global_lock:
+                for collector in _global:
+                    collector.record(statement, seconds)
+        if seconds * 1000 >= slow_query_ms:
+            slow_query_log.warning(json.dumps({
+                "event": "slow_query",
+                "ms": round(seconds * 1000, 1),
+                "threshold_ms": slow_query_ms,
+                "request": stats.label if stats else None,
+                "statement": fingerprint(statement)[:2000],
+                "executemany": executemany,
+            }))
+
+    @event.listens_for(engine, "handle_error")
+    def drop_timer(context):
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+
+def report_repeats(stats: QueryStats, threshold: int):
+    """Log one structured line per request whose statements look like an N+1"""
+    repeats = stats.repeated(threshold)
+    if repeats:
+        n_plus_one_log.warning(json.dumps({
+            "event": "n_plus_one",
+            "request": stats.label,
+            "queries": stats.count,
+            "repeated": [{"count": n, "statement": fp[:500]} for fp, n in repeats],
+        }))
@@ -0,0 +1,142 @@
+import math
+import re
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Matches in these fields count more towards a product's score
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "SKU": 3.0,
+    "options": 1.5,
+    "description": 1.0,
+}
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+class ProductSearchIndex:
+    """In-memory inverted index over products with BM25 ranking and prefix autocomplete.
+
+    Each field's terms are weighted by FIELD_WEIGHTS before BM25 is applied, so a
+    name or SKU hit outranks the same word buried in a description.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[int, float]] = {}  # term -> {productID: weighted tf}
+        self._doc_terms: Dict[int, Dict[str, float]] = {}  # productID -> {term: weighted tf}
+        self._doc_lengths: Dict[int, float] = {}
+        self._total_length = 0.0
+        self._terms: List[str] = []  # Sorted vocabulary for prefix lookups
+        self._lock = threading.RLock()
+        self.version: Optional[int] = None  # Catalog version of the last rebuild
+
+    def __len__(self):
+        return len(self._doc_terms)
+
+    def index_product(self, product_id: int, fields: Dict[str, str]):
+        """Add or replace one product. fields maps a FIELD_WEIGHTS key to its text."""
+        weighted: Counter = Counter()
+        for field, text in fields.items():
+            weight = FIELD_WEIGHTS.get(field, 1.0)
+            for term in tokenize(text):
+                weighted[term] += weight
+
+        with self._lock:
+            self._remove(product_id)
+            for term, tf in weighted.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = {}
+                    insort(self._terms, term)
+                postings[product_id] = tf
+            self._doc_terms[product_id] = dict(weighted)
+            length = sum(weighted.values())
+            self._doc_lengths[product_id] = length
+            self._total_length += length
+
+    def remove_product(self, product_id: int):
+        with self._lock:
+            self._remove(product_id)
+
+    def _remove(self, product_id: int):
+        terms = self._doc_terms.pop(product_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            del postings[product_id]
+            if not postings:
+                del self._postings[term]
+                del self._terms[bisect_left(self._terms, term)]
+        self._total_length -= self._doc_lengths.pop(product_id)
+
+    def _expand_prefix(self, prefix: str, limit: int) -> List[str]:
+        start = bisect_left(self._terms, prefix)
+        matches = []
+        for term in self._terms[start:]:
+            if not term.startswith(prefix) or len(matches) >= limit:
+                break
+            matches.append(term)
+        return matches
+
+    def search(self, query: str, limit: int = 20, prefix_expansions: int = 20) -> List[Tuple[int, float]]:
+        """Return (productID, score) pairs, best first.
+
+        The last query token also matches as a prefix, so results update while
+        the user is still typing a word.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        with self._lock:
+            doc_count = len(self._doc_terms)
+            if not doc_count:
+                return []
+            avg_length = self._total_length / doc_count
+
+            query_terms = set(tokens[:-1])
+            query_terms.update(self._expand_prefix(tokens[-1], prefix_expansions) or [tokens[-1]])
+
+            scores: Dict[int, float] = {}
+            for term in query_terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for product_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[product_id] / avg_length)
+                    scores[product_id] = scores.get(product_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[str]:
+        """Indexed terms starting with the last word of prefix, most common first"""
+        tokens = tokenize(prefix)
+        if not tokens:
+            return []
+        with self._lock:
+            candidates = self._expand_prefix(tokens[-1], limit * 20)
+            candidates.sort(key=lambda term: (-len(self._postings[term]), term))
+        head = " ".join(tokens[:-1])
+        return [f"{head} {term}" if head else term for term in candidates[:limit]]
+
+    def rebuild(self, documents: Iterable[Tuple[int, Dict[str, str]]], version: Optional[int] = None):
+        with self._lock:
+            self.version = version
+            self._postings.clear()
+            self._doc_terms.clear()
+            self._doc_lengths.clear()
+            self._terms.clear()
+            self._total_length = 0.0
+            for product_id, fields in documents:
+                self.index_product(product_id, fields)
@@ -0,0 +1,60 @@
+"""Messages per second through PooledMailer against a local aiosmtpd sink.
+
+"fresh" connects for every message, as the app did before the pool; the pooled
+runs reuse their connections. --latency delays every accepted message, to stand
+in for the round trips to a remote server.
+
+    python tests/bench_mailer.py --messages 500 --latency 0.02 --pool-sizes 1 2 4
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import conftest  # noqa: E402,F401  Puts the backend on the path and sets the mail settings
+
+from email_service import EmailSchema, PooledMailer, build_message  # noqa: E402
+from smtp_sink import SinkHandler, free_port, sink_config, start_sink  # noqa: E402
+
+
+async def run(mailer: PooledMailer, count: int) -> float:
+    messages = [
+        build_message(EmailSchema(email=f"customer{n}@example.com", subject=f"Order #{n}", body=f"<p>Order {n}</p>"))
+        for n in range(count)
+    ]
+    started = time.perf_counter()
+    errors = await mailer.send_many(messages)
+    elapsed = time.perf_counter() - started
+    await mailer.close()
+    failed = [error for error in errors if error]
+    if failed:
+        raise RuntimeError(f"{len(failed)} message(s) failed, first: {failed[0]!r}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds the sink waits per message")
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    handler = SinkHandler(latency=args.latency)
+    port = free_port()
+    controller = start_sink(handler, port)
+    try:
+        runs = [(f"fresh x{size}", PooledMailer(sink_config(port), size=size, idle_timeout=0)) for size in args.pool_sizes]
+        runs += [(f"pooled x{size}", PooledMailer(sink_config(port), size=size)) for size in args.pool_sizes]
+        print(f"{'sender':<12} {'seconds':>8} {'msg/s':>8} {'connections':>12}")
+        for label, mailer in runs:
+            handler.peers.clear()
+            elapsed = asyncio.run(run(mailer, args.messages))
+            print(f"{label:<12} {elapsed:>8.2f} {args.messages / elapsed:>8.1f} {len(handler.peers):>12}")
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main()
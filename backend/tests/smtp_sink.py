@@ -0,0 +1,48 @@
+"""Local aiosmtpd stand-in for the SMTP server, shared by the mailer test and benchmark"""
+import asyncio
+import socket
+
+from aiosmtpd.controller import Controller
+from fastapi_mail import ConnectionConfig
+
+
+class SinkHandler:
+    """Accepts every message and remembers it with the connection it came in on"""
+
+    def __init__(self, latency: float = 0):
+        self.latency = latency  # Seconds to wait before accepting, to stand in for a remote server
+        self.envelopes = []
+        self.peers = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.peers.add(session.peer)
+        self.envelopes.append(envelope)
+        return "250 Message accepted for delivery"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_sink(handler: SinkHandler, port: int) -> Controller:
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    return controller
+
+
+def sink_config(port: int) -> ConnectionConfig:
+    return ConnectionConfig(
+        MAIL_USERNAME="",
+        MAIL_PASSWORD="",
+        MAIL_FROM="shop@example.com",
+        MAIL_PORT=port,
+        MAIL_SERVER="127.0.0.1",
+        MAIL_STARTTLS=False,
+        MAIL_SSL_TLS=False,
+        USE_CREDENTIALS=False,
+        VALIDATE_CERTS=False,
+    )
@@ -0,0 +1,52 @@
+"""ETags of the catalog endpoints against the change versions a checkout moves"""
+
+
+def etag(client, **params) -> str:
+    return client.get("/customer-view-products", params=params).headers["etag"]
+
+
+def checkout(client, customer, product_id: int, quantity: int = 1):
+    customer_id, headers, address_id = customer
+    response = client.post("/add-product-cart", headers=headers, json={
+        "customerID": customer_id, "productID": product_id, "quantity": quantity, "price": 100, "selected_options": {},
+    })
+    assert response.status_code == 200, response.text
+    response = client.post("/create-order", headers=headers, json={"customerID": customer_id, "addressID": address_id})
+    assert response.status_code == 200, response.text
+
+
+def test_checkout_moves_listing_and_detail_etags(client, customer, make_product):
+    product_id = make_product(quantity=3)
+    listing, detail = etag(client), etag(client, product_id=product_id)
+
+    checkout(client, customer, product_id)
+
+    # The listing shows quantity, so a client revalidating it must get the new count
+    response = client.get("/customer-view-products", headers={"If-None-Match": listing})
+    assert response.status_code == 200
+    assert response.headers["etag"] != listing
+    assert {product["productID"]: product["quantity"] for product in response.json()["Products"]}[product_id] == 2
+    assert etag(client, product_id=product_id) != detail
+
+
+def test_checkout_keeps_etag_of_listing_without_quantity(client, customer, make_product):
+    product_id = make_product(quantity=3)
+    projected = etag(client, fields="name,price")
+
+    checkout(client, customer, product_id)
+
+    response = client.get("/customer-view-products", params={"fields": "name,price"}, headers={"If-None-Match": projected})
+    assert response.status_code == 304
+
+
+def test_order_stands_when_the_version_bump_fails(client, customer, make_product, monkeypatch):
+    import main
+
+    def fail(*names):
+        raise RuntimeError("change_versions is locked")
+    monkeypatch.setattr(main.change_versions, "bump_committed", fail)
+    scheduled = []
+    monkeypatch.setattr(main, "run_invoice_job", lambda job_id: scheduled.append(job_id))
+
+    checkout(client, customer, make_product(quantity=3))
+    assert len(scheduled) == 1
@@ -0,0 +1,59 @@
+"""Bulk unassignment of a category, committed a chunk of products at a time"""
+import uuid
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+
+@pytest.fixture
+def linked(client, admin_headers, make_product, monkeypatch):
+    """Four products linked to a new category, unassigned two products per chunk"""
+    import main
+
+    category = client.post("/add-category", json={"name": f"category-{uuid.uuid4().hex[:10]}"}, headers=admin_headers).json()["category"]
+    product_ids = [make_product() for _ in range(4)]
+    response = client.post("/assign-mul-prod-category", json={"productIDs": product_ids, "categoryID": category["categoryID"]}, headers=admin_headers)
+    assert response.status_code == 200
+    monkeypatch.setattr(main, "id_chunks", lambda ids: (sorted(ids)[start:start + 2] for start in range(0, len(ids), 2)))
+    bumps = []
+    bump = main.change_versions.bump
+    monkeypatch.setattr(main.change_versions, "bump", lambda db, *names: (bumps.append(names), bump(db, *names)))
+    return category["categoryID"], product_ids, bumps
+
+
+def unassign(client, admin_headers, category_id, product_ids):
+    return client.request("DELETE", "/unassign-mul-prod-category", json={"productIDs": product_ids, "categoryID": category_id}, headers=admin_headers)
+
+
+def test_unassign_bumps_the_version_once(client, admin_headers, linked):
+    category_id, product_ids, bumps = linked
+    response = unassign(client, admin_headers, category_id, product_ids)
+    assert response.status_code == 200
+    assert response.json()["deleted"] == {"category_links": 4}
+    assert bumps == [("products",)]
+
+
+def test_failed_chunk_reports_the_links_already_removed(client, admin_headers, linked):
+    import main
+
+    category_id, product_ids, bumps = linked
+    deletes = []
+
+    def fail_second_delete(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("DELETE FROM cat_prod"):
+            deletes.append(statement)
+            if len(deletes) == 2:
+                raise OperationalError(statement, parameters, Exception("lock wait timeout"))
+
+    event.listen(main.engine, "before_cursor_execute", fail_second_delete)
+    try:
+        response = unassign(client, admin_headers, category_id, product_ids)
+    finally:
+        event.remove(main.engine, "before_cursor_execute", fail_second_delete)
+
+    assert response.status_code == 500
+    assert response.json()["detail"]["deleted"] == {"category_links": 2}
+    assert bumps == [("products",)]  # The first chunk is committed, so caches must move
+    remaining = client.get(f"/get-product-categories/{product_ids[-1]}").json()["assignedCategories"]
+    assert category_id in remaining
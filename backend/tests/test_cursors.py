@@ -0,0 +1,36 @@
+"""Keyset cursors of the product and order listings"""
+import pytest
+
+from main import encode_cursor
+
+CRAFTED = [
+    [{"a": 1}, 2],
+    [1, {"a": 1}],
+    [[1], 2],
+    ["100", 2],
+    [100, "2"],
+    [100, True],
+    [100, 2.5],
+]
+
+
+@pytest.mark.parametrize("values", CRAFTED)
+def test_product_listing_rejects_crafted_cursors(client, values):
+    for sort in ("newest", "price-asc"):
+        response = client.get("/customer-view-products", params={"sort": sort, "cursor": encode_cursor(values)})
+        assert response.status_code == 400, response.text
+
+
+@pytest.mark.parametrize("values", [[{"a": 1}, 2], ["2024-01-01T00:00:00", "2"], ["2024-01-01T00:00:00", True], ["2024-01-01T00:00:00", 2.5]])
+def test_admin_orders_reject_crafted_cursors(client, admin_headers, values):
+    response = client.get("/admin-view-orders", params={"cursor": encode_cursor(values)}, headers=admin_headers)
+    assert response.status_code == 400, response.text
+
+
+def test_product_listing_follows_its_own_cursor(client, make_product):
+    for _ in range(3):
+        make_product()
+    for sort in ("newest", "price-asc", "price-desc"):
+        page = client.get("/customer-view-products", params={"sort": sort, "limit": 2}).json()
+        response = client.get("/customer-view-products", params={"sort": sort, "limit": 2, "cursor": page["next_cursor"]})
+        assert response.status_code == 200, response.text
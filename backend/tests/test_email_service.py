@@ -0,0 +1,84 @@
+import asyncio
+from email import message_from_bytes, policy
+
+import pytest
+
+pytest.importorskip("aiosmtpd")
+
+from email_service import EmailSchema, PooledMailer, build_message  # noqa: E402
+from smtp_sink import SinkHandler, free_port, sink_config, start_sink  # noqa: E402
+
+
+@pytest.fixture
+def sink():
+    handler = SinkHandler()
+    port = free_port()
+    controller = start_sink(handler, port)
+    yield handler, port
+    controller.stop()
+
+
+def order_email(number: int) -> EmailSchema:
+    return EmailSchema(email=f"customer{number}@example.com", subject=f"Order #{number}", body=f"<p>Order {number}</p>")
+
+
+def test_send_many_reuses_pooled_connections(sink):
+    handler, port = sink
+    mailer = PooledMailer(sink_config(port), size=2)
+
+    async def send():
+        errors = await mailer.send_many(build_message(order_email(number)) for number in range(10))
+        await mailer.close()
+        return errors
+
+    assert asyncio.run(send()) == [None] * 10
+    assert len(handler.envelopes) == 10
+    assert len(handler.peers) <= 2
+    assert sorted(envelope.rcpt_tos[0] for envelope in handler.envelopes) == sorted(f"customer{n}@example.com" for n in range(10))
+
+
+def test_message_headers_and_attachment(sink, tmp_path):
+    handler, port = sink
+    invoice = tmp_path / "invoice_7.pdf"
+    invoice.write_bytes(b"%PDF-1.4 invoice")
+    mailer = PooledMailer(sink_config(port))
+
+    async def send():
+        await mailer.send_message(build_message(order_email(7), str(invoice)))
+        await mailer.close()
+
+    asyncio.run(send())
+    sent = message_from_bytes(handler.envelopes[0].content, policy=policy.default)
+    assert sent["From"] == "shop@example.com"
+    assert sent["To"] == "customer7@example.com"
+    assert sent["Subject"] == "Order #7"
+    assert sent.get_body(("html",)).get_content().strip() == "<p>Order 7</p>"
+    [attachment] = list(sent.iter_attachments())
+    assert attachment.get_filename() == "invoice_7.pdf"
+    assert attachment.get_content_type() == "application/pdf"
+    assert attachment.get_content() == b"%PDF-1.4 invoice"
+
+
+def test_reconnects_after_server_restart():
+    handler = SinkHandler()
+    port = free_port()
+    controller = start_sink(handler, port)
+    mailer = PooledMailer(sink_config(port), size=1)
+
+    async def send(number: int):
+        await mailer.send_message(build_message(order_email(number)))
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(send(1))
+        # The pooled connection dies with the server; the next message goes over a new one
+        controller.stop()
+        controller = start_sink(handler, port)
+        loop.run_until_complete(send(2))
+        loop.run_until_complete(mailer.close())
+    finally:
+        loop.close()
+        controller.stop()
+
+    assert [envelope.rcpt_tos[0] for envelope in handler.envelopes] == ["customer1@example.com", "customer2@example.com"]
+    assert len(handler.peers) == 2
@@ -0,0 +1,76 @@
+"""Query budgets of the hot endpoints, with enough rows that an N+1 would blow them"""
+import pytest
+
+from query_stats import assert_max_queries
+
+OPTIONS = [
+    {"title": title, "type": "dropdown", "required": "yes", "values": [
+        {"title": value, "price": 1, "sku": value, "quantity": 5} for value in values
+    ]}
+    for title, values in (("Color", ("Red", "Blue")), ("Size", ("M", "L")))
+]
+
+
+@pytest.fixture
+def catalog(make_product, monkeypatch):
+    import main
+
+    # Change versions are read once below and then come from memory for the whole test
+    monkeypatch.setattr(main.change_versions, "ttl", 3600)
+    main.change_versions.refresh()
+    return [make_product(options=OPTIONS) for _ in range(5)]
+
+
+def budget(limit: int, label: str):
+    import main
+
+    main.change_versions.refresh()  # Pick up the writes the fixtures made, outside the budget
+    return assert_max_queries(limit, label)
+
+
+def test_product_listing(client, catalog):
+    with budget(1, "listing"):
+        assert client.get("/customer-view-products", params={"limit": 24}).status_code == 200
+
+
+def test_product_detail(client, catalog):
+    # The product, then its options and their values
+    with budget(3, "detail"):
+        assert client.get("/customer-view-products", params={"product_id": catalog[0]}).status_code == 200
+
+
+def test_product_variations(client, catalog):
+    with budget(2, "variations"):
+        response = client.get("/get-product-variations", params={"ids": ",".join(map(str, catalog))})
+    assert response.status_code == 200
+    assert len(response.json()["variations"]) == len(catalog)
+    with budget(2, "variations of one product"):
+        assert client.get(f"/get-product-variations/{catalog[0]}").status_code == 200
+
+
+def test_cart(client, catalog, customer):
+    customer_id, headers, _ = customer
+    for product_id in catalog:
+        client.post("/add-product-cart", headers=headers, json={
+            "customerID": customer_id, "productID": product_id, "quantity": 1, "price": 100,
+            "selected_options": {"Color": "Red", "Size": "M"},
+        })
+    with budget(1, "cart"):
+        response = client.get("/cart", params={"customerID": customer_id}, headers=headers)
+    assert len(response.json()) == len(catalog)
+
+
+def test_admin_orders(client, catalog, customer, admin_headers):
+    customer_id, headers, address_id = customer
+    for product_id in catalog:
+        client.post("/add-product-cart", headers=headers, json={
+            "customerID": customer_id, "productID": product_id, "quantity": 1, "price": 100, "selected_options": {},
+        })
+        assert client.post("/create-order", headers=headers, json={"customerID": customer_id, "addressID": address_id}).status_code == 200
+    # The total, then one page joined with the customers
+    with budget(2, "admin orders"):
+        response = client.get("/admin-view-orders", params={"limit": 3}, headers=admin_headers)
+    assert response.status_code == 200 and len(response.json()) == 3
+    with budget(2, "admin orders, next page"):
+        response = client.get("/admin-view-orders", params={"limit": 3, "cursor": response.headers["x-next-cursor"]}, headers=admin_headers)
+    assert response.status_code == 200
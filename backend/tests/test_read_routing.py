@@ -0,0 +1,101 @@
+"""ReplicaRouter across two workers, with two SQLite files standing in for the primary and a lagging replica"""
+import time
+
+import pytest
+from sqlalchemy import create_engine, text
+from starlette.requests import Request
+
+from db_routing import READ_PIN_COOKIE, READ_PIN_HEADER, ReplicaRouter
+
+
+def make_database(path):
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE replica_heartbeat (id INTEGER PRIMARY KEY, beat_ms BIGINT NOT NULL DEFAULT 0)"))
+        conn.execute(text("CREATE TABLE change_versions (name VARCHAR(64) PRIMARY KEY, version INTEGER NOT NULL)"))
+        conn.execute(text("INSERT INTO replica_heartbeat (id, beat_ms) VALUES (1, 0)"))
+        conn.execute(text("INSERT INTO change_versions (name, version) VALUES ('products', 0)"))
+    return engine
+
+
+def replicate(primary, replica, delay: float = 0):
+    """Copy the primary's heartbeat and versions to the replica, as of `delay` seconds ago"""
+    with primary.connect() as conn:
+        beat_ms = conn.execute(text("SELECT beat_ms FROM replica_heartbeat WHERE id = 1")).scalar()
+        versions = conn.execute(text("SELECT name, version FROM change_versions")).all()
+    with replica.begin() as conn:
+        conn.execute(text("UPDATE replica_heartbeat SET beat_ms = :beat_ms WHERE id = 1"), {"beat_ms": beat_ms - int(delay * 1000)})
+        for name, version in versions:
+            conn.execute(text("UPDATE change_versions SET version = :version WHERE name = :name"), {"name": name, "version": version})
+
+
+def request(headers=None, cookies=None) -> Request:
+    raw = [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()]
+    if cookies:
+        raw.append((b"cookie", "; ".join(f"{name}={value}" for name, value in cookies.items()).encode()))
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+@pytest.fixture
+def workers(tmp_path):
+    primary = make_database(tmp_path / "primary.db")
+    replica = make_database(tmp_path / "replica.db")
+    # Two app processes behind a load balancer, sharing the same two databases
+    worker_a = ReplicaRouter(primary, replica, max_lag=2.0, interval=0.5)
+    worker_b = ReplicaRouter(primary, replica, max_lag=2.0, interval=0.5)
+    yield primary, replica, worker_a, worker_b
+    primary.dispose()
+    replica.dispose()
+
+
+def test_caught_up_replica_serves_reads(workers):
+    primary, replica, worker_a, worker_b = workers
+    worker_a.beat()
+    replicate(primary, replica)
+    worker_b.check()
+    assert worker_b.healthy
+    assert worker_b.use_replica(request(), {"products": 0})
+
+
+def test_lagging_replica_falls_back_to_primary(workers):
+    primary, replica, worker_a, worker_b = workers
+    worker_a.beat()
+    replicate(primary, replica, delay=5)
+    worker_b.check()
+    assert worker_b.lag >= 5
+    assert not worker_b.healthy
+    assert not worker_b.use_replica(request(), {})
+
+
+def test_replica_behind_required_version_falls_back(workers):
+    primary, replica, worker_a, worker_b = workers
+    worker_a.beat()
+    replicate(primary, replica)
+    with primary.begin() as conn:
+        conn.execute(text("UPDATE change_versions SET version = 1 WHERE name = 'products'"))
+    worker_b.check()
+    assert not worker_b.use_replica(request(), {"products": 1})
+    replicate(primary, replica)
+    worker_b.check()
+    assert worker_b.use_replica(request(), {"products": 1})
+
+
+def test_write_on_one_worker_pins_reads_on_the_other(workers):
+    primary, replica, worker_a, worker_b = workers
+    worker_a.beat()
+    replicate(primary, replica)
+    worker_b.check()
+
+    pin = worker_a.pin()  # Returned by the write (e.g. /create-order) handled on worker A
+    assert not worker_b.use_replica(request(headers={READ_PIN_HEADER: pin}), {})
+    assert not worker_b.use_replica(request(cookies={READ_PIN_COOKIE: pin}), {})
+    assert worker_b.use_replica(request(), {})
+
+
+def test_expired_or_garbled_pin_is_ignored(workers):
+    primary, replica, worker_a, worker_b = workers
+    worker_a.beat()
+    replicate(primary, replica)
+    worker_b.check()
+    assert worker_b.use_replica(request(headers={READ_PIN_HEADER: f"{time.time() - 1:.3f}"}), {})
+    assert worker_b.use_replica(request(headers={READ_PIN_HEADER: "soon"}), {})
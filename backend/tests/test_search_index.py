@@ -0,0 +1,70 @@
+"""BM25 ranking and prefix matching of ProductSearchIndex, and its refresh in the app"""
+import uuid
+
+from search_index import ProductSearchIndex
+
+PRODUCTS = {
+    1: {"name": "Galaxy phone", "SKU": "GX-1", "description": "A phone with a large screen", "options": ""},
+    2: {"name": "Phone case", "SKU": "CASE-2", "description": "Fits the galaxy phone", "options": "Red Blue"},
+    3: {"name": "Charger", "SKU": "CH-3", "description": "Charges a phone or a tablet quickly", "options": ""},
+    4: {"name": "Garden hose", "SKU": "GH-4", "description": "Twenty metres", "options": "Green"},
+}
+
+
+def build() -> ProductSearchIndex:
+    index = ProductSearchIndex()
+    index.rebuild(PRODUCTS.items(), version=1)
+    return index
+
+
+def test_name_match_outranks_description_match():
+    ranked = [product_id for product_id, _ in build().search("galaxy")]
+    assert ranked == [1, 2]
+
+
+def test_rarer_terms_weigh_more():
+    # "phone" is in three products, "charger" in one
+    assert build().search("phone charger")[0][0] == 3
+
+
+def test_last_word_matches_as_prefix():
+    index = build()
+    assert [product_id for product_id, _ in index.search("gar")] == [4]
+    assert {product_id for product_id, _ in index.search("ph")} == {1, 2, 3}
+    assert index.search("phone gar")[0][0] == 4  # Only the last word is a prefix
+    assert index.search("pho gar") == index.search("gar")
+
+
+def test_suggest_orders_by_document_count():
+    assert build().suggest("ga") == ["galaxy", "garden"]
+    assert build().suggest("galaxy ph") == ["galaxy phone"]
+
+
+def test_reindex_and_remove_keep_the_vocabulary_sorted():
+    index = build()
+    index.index_product(4, {"name": "Garden tap"})
+    index.remove_product(3)
+    assert index.search("hose") == []
+    assert index.search("charger") == []
+    assert [product_id for product_id, _ in index.search("tap")] == [4]
+    assert index.suggest("g") == ["galaxy", "garden", "gx"]  # "gh" and "green" went with the old entry
+    assert len(index) == 3
+
+
+def test_search_picks_up_an_edit_from_another_worker(client, make_product):
+    import main
+    from sqlmodel import Session
+
+    product_id = make_product(name=f"lamp {uuid.uuid4().hex[:8]}")
+    new_name = f"lantern{uuid.uuid4().hex[:8]}"
+
+    # Another worker's edit: committed with a version bump, but not indexed in this process
+    with Session(main.engine) as db:
+        product = db.get(main.Products, product_id)
+        product.name = new_name
+        main.change_versions.bump(db, "products")
+        db.commit()
+
+    found = client.get("/search", params={"q": new_name}).json()["Products"]
+    assert [product["productID"] for product in found] == [product_id]
+    assert client.get("/search/autocomplete", params={"q": new_name[:9]}).json()["suggestions"] == [new_name]
@@ -4,10 +4,13 @@ import { BrowserRouter } from "react-router-dom";
 import { HelmetProvider } from "react-helmet-async";
 
 import App from "./app";
+import { installReadPin } from "./utils/read-pin";
 import { AuthProvider } from "./contexts/AuthContext"; // Import AuthProvider
 
 // ----------------------------------------------------------------------
 
+installReadPin();
+
 const root = ReactDOM.createRoot(document.getElementById("root") as HTMLElement);
 
 root.render(
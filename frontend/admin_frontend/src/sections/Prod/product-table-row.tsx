@@ -38,12 +38,13 @@ export type ProductProps = {
 
 type ProductTableRowProps = {
   row: ProductProps;
+  variations?: ProductProps['variations']; // Loaded once per page by the table view
   selected: boolean;
   onSelectRow: () => void;
   onUserUpdated: () => void; // Callback to refresh user list after update or delete
 };
 
-export function UserTableRow({ row, selected, onSelectRow, onUserUpdated }: ProductTableRowProps) {
+export function UserTableRow({ row, variations, selected, onSelectRow, onUserUpdated }: ProductTableRowProps) {
   const { user, token } = useAuth(); // Get authenticated user data
   const [openPopover, setOpenPopover] = useState<HTMLButtonElement | null>(null);
   const [openEditDialog, setOpenEditDialog] = useState(false);
@@ -99,14 +100,8 @@ export function UserTableRow({ row, selected, onSelectRow, onUserUpdated }: Prod
         });
         setSelectedCategories(assignedCategoriesRes.data.assignedCategories);
 
-        // Fetch product variations (options and values)
-        
-        const response = await axios.get(`http://localhost:8000/get-product-variations/${row.productID}`, {
-            headers: { Authorization: `Bearer ${token}` }
-          });
-        console.log("Product Variations:", response.data);
-        console.log(response.data.variations);
-        setProductVariations(response.data.variations);  
+        // Variations come from the table's batch request; copy them so edits stay local until saved
+        setProductVariations(JSON.parse(JSON.stringify(variations || [])));
     } catch (err) {
         console.error("Failed to fetch product details", err);
     }
@@ -173,6 +173,25 @@ const handleValueChange = (
 
   const notFound = !dataFiltered.length && !!filterName;
 
+  const pageRows = dataFiltered.slice(
+    table.page * table.rowsPerPage,
+    table.page * table.rowsPerPage + table.rowsPerPage
+  );
+  const pageProductIds = pageRows.map((row) => row.productID).join(',');
+
+  // Variations for every row on the page in one request, instead of one per row
+  const [variationsByProduct, setVariationsByProduct] = useState<Record<number, ProductProps['variations']>>({});
+  useEffect(() => {
+    if (!token || !pageProductIds) return;
+    axios
+      .get("http://localhost:8000/get-product-variations", {
+        params: { ids: pageProductIds },
+        headers: { Authorization: `Bearer ${token}` },
+      })
+      .then((response) => setVariationsByProduct((current) => ({ ...current, ...response.data.variations })))
+      .catch((err) => console.error("Failed to fetch product variations", err));
+  }, [token, pageProductIds, products]);
+
   // Open/Close Add Product Dialog (only for admin)
   const handleOpenAddProduct = () => {
     if (user && user.role === 'admin') {
@@ -411,15 +430,12 @@ const handleValueChange = (
                   ]}
                 />
                 <TableBody>
-                  {dataFiltered
-                    .slice(
-                      table.page * table.rowsPerPage,
-                      table.page * table.rowsPerPage + table.rowsPerPage
-                    )
+                  {pageRows
                     .map((row) => (
                       <UserTableRow
                         key={row.productID}
                         row={row}
+                        variations={variationsByProduct[row.productID]}
                         selected={selectedProducts.includes(row.productID)}
                         onSelectRow={() => handleSelectRow(row.productID)}
                         onUserUpdated={fetchProducts} 
@@ -54,7 +54,7 @@ export function UserTableToolbar({ numSelected, filterName, onFilterName, onDele
   fullWidth
   value={filterName}
   onChange={onFilterName}
-  placeholder="Search by Order ID..."
+  placeholder="Search by customer email..."
   startAdornment={
     <InputAdornment position="start">
       <Iconify width={20} icon="eva:search-fill" sx={{ color: 'text.disabled' }} />
@@ -5,7 +5,9 @@ import Box from '@mui/material/Box';
 import Card from '@mui/material/Card';
 import Table from '@mui/material/Table';
 import Button from '@mui/material/Button';
+import TableRow from '@mui/material/TableRow';
 import TableBody from '@mui/material/TableBody';
+import TableCell from '@mui/material/TableCell';
 import Typography from '@mui/material/Typography';
 import TableContainer from '@mui/material/TableContainer';
 import TablePagination from '@mui/material/TablePagination';
@@ -43,8 +45,12 @@ export function OrdersView() {
   const [selectedProducts, setSelectedProducts] = useState<number[]>([]);
   const [orders, setOrders] = useState<OrderProps[]>([]);
   const [filterName, setFilterName] = useState('');
+  const [emailSearch, setEmailSearch] = useState(''); // filterName once typing pauses
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
+  const [totalCount, setTotalCount] = useState(0);
+  // cursors[n] fetches page n; the server hands out the next one in X-Next-Cursor
+  const [cursors, setCursors] = useState<(string | null)[]>([null]);
 
 
 
@@ -53,13 +59,20 @@ export function OrdersView() {
   const fetchOrders = async () => {
     if (!token) return;
     setLoading(true);
-    console.log("fetching orders");
     try {
-      console.log("fetching orders &&");
+      const cursor = cursors[table.page];
       const response = await axios.get("http://localhost:8000/admin-view-orders", {
-        headers: { Authorization: `Bearer ${token}` }
+        headers: { Authorization: `Bearer ${token}` },
+        params: {
+          limit: table.rowsPerPage,
+          ...(cursor ? { cursor } : {}),
+          ...(emailSearch ? { email: emailSearch } : {}),
+        },
       });
       setOrders(response.data);
+      setTotalCount(Number(response.headers['x-total-count'] ?? response.data.length));
+      const next = response.headers['x-next-cursor'] ?? null;
+      setCursors((prev) => [...prev.slice(0, table.page + 1), next]);
     } catch (err) {
       setError("Failed to fetch products");
     } finally {
@@ -70,7 +83,24 @@ export function OrdersView() {
 
   useEffect(() => {
       fetchOrders();
-    }, [token]);
+    }, [token, table.page, table.rowsPerPage, emailSearch]);
+
+  // The search runs on the server over all orders; a new one starts again from page 0
+  useEffect(() => {
+    const timer = setTimeout(() => {
+      const search = filterName.trim();
+      if (search === emailSearch) return;
+      setCursors([null]);
+      table.onResetPage();
+      setEmailSearch(search);
+    }, 300);
+    return () => clearTimeout(timer);
+  }, [filterName]);
+
+  const handleChangeRowsPerPage = (event: React.ChangeEvent<HTMLInputElement>) => {
+    setCursors([null]); // Cursors depend on the page size
+    table.onChangeRowsPerPage(event);
+  };
 
 
   // Filter products based on search input
@@ -78,13 +108,14 @@ export function OrdersView() {
     setFilterName(event.target.value);
   };
 
+  // Sorts the current page only; the search was already applied by the server
   const dataFiltered = applyFilter({
     inputData: orders,
     comparator: getComparator(table.order, table.orderBy),
-    filterName,
+    filterName: '',
   });
 
-  const notFound = !dataFiltered.length && !!filterName;
+  const notFound = !loading && !orders.length && !!emailSearch;
 
 
   const handleBulkDelete = async () => {
@@ -142,11 +173,7 @@ export function OrdersView() {
         
       </Box>
 
-      {loading ? (
-        <Box display="flex" justifyContent="center" mt={5}>
-          <CircularProgress />
-        </Box>
-      ) : error ? (
+      {error ? (
         <Typography color="error">{error}</Typography>
       ) : (
         <Card>
@@ -180,11 +207,14 @@ export function OrdersView() {
                   ]}
                 />
                 <TableBody>
-                  {dataFiltered
-                    .slice(
-                      table.page * table.rowsPerPage,
-                      table.page * table.rowsPerPage + table.rowsPerPage
-                    )
+                  {loading && (
+                    <TableRow>
+                      <TableCell align="center" colSpan={7}>
+                        <CircularProgress />
+                      </TableCell>
+                    </TableRow>
+                  )}
+                  {!loading && dataFiltered
                     .map((row) => (
                       <OrderTableRow
                         key={row.orderID}
@@ -194,6 +224,7 @@ export function OrdersView() {
                         onUserUpdated={fetchOrders} 
                       />
                     ))}
+                  {notFound && <TableNoData searchQuery={emailSearch} />}
                 </TableBody>
               </Table>
             </TableContainer>
@@ -202,11 +233,11 @@ export function OrdersView() {
           <TablePagination
             component="div"
             page={table.page}
-            count={orders.length}
+            count={totalCount}
             rowsPerPage={table.rowsPerPage}
             onPageChange={table.onChangePage}
             rowsPerPageOptions={[5, 10, 25]}
-            onRowsPerPageChange={table.onChangeRowsPerPage}
+            onRowsPerPageChange={handleChangeRowsPerPage}
           />
         </Card>
       )}
@@ -0,0 +1,25 @@
+import axios from 'axios';
+
+// ----------------------------------------------------------------------
+
+// After a write the backend returns X-Read-Pin; echoing it keeps our reads on the
+// primary database until the replicas have caught up (e.g. the order list after an update)
+const READ_PIN_KEY = 'read_pin';
+
+export function installReadPin() {
+  axios.interceptors.request.use((config) => {
+    const readPin = sessionStorage.getItem(READ_PIN_KEY);
+    if (readPin) {
+      config.headers['X-Read-Pin'] = readPin;
+    }
+    return config;
+  });
+
+  axios.interceptors.response.use((response) => {
+    const readPin = response.headers['x-read-pin'];
+    if (readPin) {
+      sessionStorage.setItem(READ_PIN_KEY, readPin);
+    }
+    return response;
+  });
+}
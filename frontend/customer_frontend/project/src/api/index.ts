@@ -18,6 +18,10 @@ const apiWithoutInterceptor = axios.create({
   },
 });
 
+// After a write the backend returns X-Read-Pin; echoing it keeps our reads on the
+// primary database until the replicas have caught up (e.g. the order list after checkout)
+const READ_PIN_KEY = 'read_pin';
+
 // Add request interceptor to include auth token
 api.interceptors.request.use(
   (config) => {
@@ -25,11 +29,23 @@ api.interceptors.request.use(
     if (token) {
       config.headers.Authorization = `Bearer ${token}`;
     }
+    const readPin = sessionStorage.getItem(READ_PIN_KEY);
+    if (readPin) {
+      config.headers['X-Read-Pin'] = readPin;
+    }
     return config;
   },
   (error) => Promise.reject(error)
 );
 
+api.interceptors.response.use((response) => {
+  const readPin = response.headers['x-read-pin'];
+  if (readPin) {
+    sessionStorage.setItem(READ_PIN_KEY, readPin);
+  }
+  return response;
+});
+
 // Auth API
 export const authAPI = {
   login: async (email: string, password: string) => {
@@ -15,7 +15,7 @@ const HomePage: React.FC = () => {
     const fetchProducts = async () => {
       try {
         // In a real app, you would have specific endpoints for these categories
-        const response = await productsAPI.getProducts();
+        const response = await productsAPI.getProducts({ limit: 8 });
         const products=response.Products;
         // For demo purposes, we'll filter the products here
         setFeaturedProducts(products.slice(0, 4));
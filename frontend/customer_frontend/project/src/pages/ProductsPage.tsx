@@ -11,6 +11,9 @@ const ProductsPage: React.FC = () => {
  
   const [products, setProducts] = useState<Product[]>([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [queryParams, setQueryParams] = useState<any>({});
   const [filter, setFilter] = useState<Filter>({
     category_id: categoryIDFromURL ? Number(categoryIDFromURL) : null,    
     minPrice: searchParams.get('minPrice') ? Number(searchParams.get('minPrice')) : null,
@@ -40,6 +43,8 @@ const ProductsPage: React.FC = () => {
         console.log("Fetching products with params:", params);
         const data = await productsAPI.getProducts(params);
         setProducts(data.Products);
+        setNextCursor(data.next_cursor);
+        setQueryParams(params);
       } catch (error) {
         console.error("Failed to fetch products:", error);
       } finally {
@@ -56,6 +61,21 @@ const ProductsPage: React.FC = () => {
     setFilter(newFilter);
   };
 
+  // The API returns one page at a time; follow next_cursor for the next one
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const data = await productsAPI.getProducts({ ...queryParams, cursor: nextCursor });
+      setProducts((current) => [...current, ...data.Products]);
+      setNextCursor(data.next_cursor);
+    } catch (error) {
+      console.error("Failed to fetch more products:", error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   return (
     <div className="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8 py-8">
       <h1 className="text-3xl font-bold text-gray-900 mb-6">All Products</h1>
@@ -73,11 +93,24 @@ const ProductsPage: React.FC = () => {
               <div className="animate-spin rounded-full h-12 w-12 border-t-2 border-b-2 border-indigo-600"></div>
             </div>
           ) : products.length > 0 ? (
-            <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 gap-6">
-              {products.map((product) => (
-                <ProductCard key={product.productID} product={product} />
-              ))}
-            </div>
+            <>
+              <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 gap-6">
+                {products.map((product) => (
+                  <ProductCard key={product.productID} product={product} />
+                ))}
+              </div>
+              {nextCursor && (
+                <div className="flex justify-center mt-8">
+                  <button
+                    onClick={loadMore}
+                    disabled={loadingMore}
+                    className="bg-indigo-600 text-white py-2 px-6 rounded-md font-medium hover:bg-indigo-700 disabled:opacity-50"
+                  >
+                    {loadingMore ? 'Loading...' : 'Load more'}
+                  </button>
+                </div>
+              )}
+            </>
           ) : (
             <div className="text-center py-12">
               <h3 className="text-lg font-medium text-gray-900 mb-2">No products found</h3>